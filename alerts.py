@@ -0,0 +1,214 @@
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from config import alert_transport, alert_to, alert_from, alert_webhook_url, alert_file_path
+from config import alert_dedupe_seconds, alert_batch_seconds, alert_max_retries, alert_queue_size
+from metrics import metrics
+
+
+class TwilioTransport:
+    """SMS through Twilio's Client.messages.create (blocking; only ever called from the dispatcher thread)"""
+
+    def __init__(self, account_sid, auth_token, to, from_):
+        from twilio.rest import Client  # Optional dependency, only needed for SMS
+        self.client = Client(account_sid, auth_token)
+        self.to = to
+        self.from_ = from_
+
+    def send(self, text, signals):
+        self.client.messages.create(to=self.to, from_=self.from_, body=text)
+
+
+class WebhookTransport:
+    """POST {'text', 'signals'} as JSON to a URL (Slack/Discord-style incoming webhooks)"""
+
+    def __init__(self, url, timeout=10):
+        import requests
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def send(self, text, signals):
+        response = self.session.post(self.url, json={'text': text, 'signals': signals}, timeout=self.timeout)
+        response.raise_for_status()
+
+
+class FileTransport:
+    """Append one JSON line per dispatched message"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, text, signals):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps({'time': datetime.now().isoformat(), 'text': text, 'signals': signals}, default=str) + '\n')
+
+
+class StubTransport:
+    """In-memory transport for local runs; fails the first `failures` sends to exercise retries"""
+
+    def __init__(self, failures=0, delay=0.0):
+        self.failures = failures
+        self.delay = delay
+        self.sent = []
+
+    def send(self, text, signals):
+        time.sleep(self.delay)
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError("stub transport failure")
+        self.sent.append((text, signals))
+
+
+def make_transport(kind=alert_transport):
+    """Build the transport named in config.alert_transport (None disables alerts)"""
+    if kind is None:
+        return None
+    if kind == 'twilio':
+        from config import account_sid, auth_token
+        return TwilioTransport(account_sid, auth_token, alert_to, alert_from)
+    if kind == 'webhook':
+        return WebhookTransport(alert_webhook_url)
+    if kind == 'file':
+        return FileTransport(alert_file_path)
+    if kind == 'stub':
+        return StubTransport()
+    raise ValueError(f"Unknown alert transport: {kind}")
+
+
+def format_message(signals):
+    """One line per signal, e.g. 'BUY RELIANCE @ 2450.0 SL 2401.5 T 2547.0 (R:R 2.0)'"""
+    lines = []
+    for s in signals:
+        line = f"{s['decision']} {s['ticker']}"
+        if 'entry' in s:
+            line += f" @ {s['entry']} SL {s['stop_loss']} T {s['target']} (R:R {s['risk_reward']})"
+        elif s.get('reason'):
+            line += f" - {s['reason']}"
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+class AlertDispatcher:
+    """
+    Background alert delivery for trade signals.
+
+    submit() only enqueues and never blocks the caller. A worker thread
+    gathers whatever arrives within `batch_seconds` into one message, skips
+    any ticker/decision already sent within `dedupe_seconds`, and retries
+    failed sends with exponential backoff.
+    """
+
+    def __init__(self, transport, dedupe_seconds=alert_dedupe_seconds, batch_seconds=alert_batch_seconds,
+                 max_retries=alert_max_retries, backoff=1.0, maxsize=alert_queue_size):
+        self.transport = transport
+        self.dedupe_seconds = dedupe_seconds
+        self.batch_seconds = batch_seconds
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.last_sent = {}
+        self.counts = {'submitted': 0, 'sent': 0, 'deduplicated': 0, 'dropped': 0, 'failed': 0, 'messages': 0}
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        metrics.add_collector(self._gauges)
+
+    def submit(self, signal):
+        """Queue a signal dict (evaluate_trade result); returns False if the queue is full"""
+        try:
+            self.queue.put_nowait((time.time(), dict(signal)))
+        except queue.Full:
+            self.counts['dropped'] += 1
+            metrics.inc('alerts_total', result='dropped')
+            return False
+        self.counts['submitted'] += 1
+        return True
+
+    def _run(self):
+        while self.running or not self.queue.empty():
+            try:
+                batch = [self.queue.get(timeout=0.2)]
+            except queue.Empty:
+                continue
+            deadline = time.time() + self.batch_seconds
+            while True:
+                remaining = deadline - time.time()
+                try:
+                    batch.append(self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._dispatch(batch)
+
+    def _coalesce(self, batch):
+        """Latest signal per (ticker, decision), minus those sent within the dedupe window"""
+        now = time.time()
+        merged = {}
+        for queued_at, signal in batch:
+            key = (signal.get('ticker'), signal.get('decision'))
+            if now - self.last_sent.get(key, float('-inf')) < self.dedupe_seconds:
+                self.counts['deduplicated'] += 1
+                metrics.inc('alerts_total', result='deduplicated')
+                continue
+            if key in merged:
+                self.counts['deduplicated'] += 1
+                metrics.inc('alerts_total', result='deduplicated')
+            merged[key] = (min(queued_at, merged.get(key, (queued_at,))[0]), signal)
+        return merged
+
+    def _dispatch(self, batch):
+        merged = self._coalesce(batch)
+        if not merged:
+            return
+        signals = [signal for _, signal in merged.values()]
+        text = format_message(signals)
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.transport.send(text, signals)
+                break
+            except Exception as e:
+                if attempt == self.max_retries:
+                    print(f"Alert delivery failed after {attempt + 1} attempts: {str(e)}")
+                    self.counts['failed'] += len(signals)
+                    metrics.inc('alerts_total', len(signals), result='failed')
+                    return
+                metrics.inc('retries_total', method='alerts')
+                time.sleep(self.backoff * 2 ** attempt)
+
+        sent_at = time.time()
+        for key, (queued_at, _) in merged.items():
+            self.last_sent[key] = sent_at
+            latency = sent_at - queued_at
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+            metrics.observe('alert_dispatch_seconds', latency)
+        self.counts['sent'] += len(signals)
+        self.counts['messages'] += 1
+        metrics.inc('alerts_total', len(signals), result='sent')
+
+    def _gauges(self):
+        return [('alert_queue_depth', {}, self.queue.qsize())]
+
+    def stats(self):
+        """Queue depth, per-outcome counts and enqueue-to-delivery latency"""
+        sent = self.counts['sent']
+        return {
+            'queue_depth': self.queue.qsize(),
+            **self.counts,
+            'latency_avg': self.latency_total / sent if sent else None,
+            'latency_max': self.latency_max,
+        }
+
+    def close(self, timeout=30):
+        """Deliver what is queued, then stop the worker"""
+        self.running = False
+        self.thread.join(timeout)
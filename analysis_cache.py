@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+
+
+class MemoCache:
+    """
+    Thread-safe LRU memo with optional per-entry TTL.
+
+    Concurrent callers asking for the same key wait for the first one to
+    finish instead of repeating the work, so each key is computed once.
+    `counts` records how many times each (kind, name) pair was computed.
+    """
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.key_locks = {}
+        self.counts = Counter()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key, ttl):
+        entry = self.entries.get(key)
+        if entry is None:
+            return False, None
+        value, stored_at = entry
+        if ttl is not None and time.time() - stored_at > ttl:
+            del self.entries[key]
+            return False, None
+        self.entries.move_to_end(key)
+        return True, value
+
+    def get_or_compute(self, key, compute, ttl=None, count_as=None, cache_none=False):
+        """
+        Return the memoized value for `key`, calling `compute()` on a miss.
+        A None result (e.g. a failed fetch) is only memoized with cache_none,
+        so a failing key is not retried until the entry expires.
+        """
+        with self.lock:
+            found, value = self._lookup(key, ttl)
+            if found:
+                self.hits += 1
+                return value
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            try:
+                with self.lock:
+                    found, value = self._lookup(key, ttl)
+                    if found:
+                        self.hits += 1
+                        return value
+                    self.misses += 1
+                value = compute()
+                with self.lock:
+                    if count_as is not None:
+                        self.counts[count_as] += 1
+                    if value is not None or cache_none:
+                        self.entries[key] = (value, time.time())
+                        self.entries.move_to_end(key)
+                        while len(self.entries) > self.maxsize:
+                            self.entries.popitem(last=False)
+            finally:
+                with self.lock:
+                    self.key_locks.pop(key, None)
+        return value
+
+    def peek(self, key, ttl=None):
+        """Stored value for `key` if younger than `ttl` (any age when None), without counting a hit"""
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is None or (ttl is not None and time.time() - entry[1] > ttl):
+            return None
+        return entry[0]
+
+    def put(self, key, value, keep_age=False):
+        """
+        Store `value` for `key` as if it had just been computed; with keep_age
+        an existing entry's value is replaced but its TTL clock keeps running
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            stored_at = entry[1] if keep_age and entry else time.time()
+            self.entries[key] = (value, stored_at)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def discard(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {'size': len(self.entries), 'hits': self.hits, 'misses': self.misses, 'counts': dict(self.counts)}
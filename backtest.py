@@ -0,0 +1,180 @@
+import time
+import numpy as np
+import pandas as pd
+
+from indicators import build_panel, compute_indicators, synthetic_frames
+
+# Same gates as evaluate_trade
+DEFAULT_RULES = {
+    'adx_min': 25,
+    'rvol_min': 0.3,
+    'stop_atr': 2,
+    'target_atr': 4,
+}
+RISK_PER_TRADE = 0.01  # Fraction of equity lost at the stop in the drawdown curve
+
+
+def signal_mask(indicators, adx_min=25, rvol_min=0.3):
+    """evaluate_trade BUY conditions for every (symbol, bar) at once"""
+    with np.errstate(invalid='ignore'):
+        return (
+            (indicators['adx'] > adx_min)
+            & (indicators['plus_di'] > indicators['minus_di'])
+            & (indicators['9_ema'] > indicators['21_ema'])
+            & (indicators['21_ema'] > indicators['50_ema'])
+            & (indicators['rvol'] > rvol_min)
+        )
+
+
+def simulate_trades(panel, atr, signals, stop_atr=2, target_atr=4):
+    """
+    Enter at the close of a signal bar and exit at the ATR stop or target.
+
+    Bars are walked once with every symbol updated in the same NumPy step,
+    holding at most one open position per symbol. If stop and target are both
+    touched in one bar the stop is assumed to fill first; gaps through either
+    level fill at the open. Positions still open on the last bar are closed at
+    its close. Returns a dict of equal-length trade arrays.
+    """
+    open_, high, low, close = panel['open'], panel['high'], panel['low'], panel['close']
+    n_symbols, n_bars = close.shape
+    rows = np.arange(n_symbols)
+
+    in_trade = np.zeros(n_symbols, dtype=bool)
+    entry_idx = np.zeros(n_symbols, dtype=np.int64)
+    entry_px = np.zeros(n_symbols)
+    stop_px = np.zeros(n_symbols)
+    target_px = np.zeros(n_symbols)
+    trades = {k: [] for k in ('row', 'entry_idx', 'exit_idx', 'entry', 'exit', 'stop', 'target', 'reason')}
+
+    def record(mask, bar, exit_px, reason):
+        idx = rows[mask]
+        trades['row'].append(idx)
+        trades['entry_idx'].append(entry_idx[idx])
+        trades['exit_idx'].append(np.full(len(idx), bar))
+        trades['entry'].append(entry_px[idx])
+        trades['exit'].append(exit_px[idx])
+        trades['stop'].append(stop_px[idx])
+        trades['target'].append(target_px[idx])
+        trades['reason'].append(np.full(len(idx), reason))
+
+    for bar in range(n_bars):
+        if in_trade.any():
+            with np.errstate(invalid='ignore'):
+                hit_stop = in_trade & (low[:, bar] <= stop_px)
+                hit_target = in_trade & ~hit_stop & (high[:, bar] >= target_px)
+            if hit_stop.any():
+                record(hit_stop, bar, np.minimum(open_[:, bar], stop_px), 'stop')
+            if hit_target.any():
+                record(hit_target, bar, np.maximum(open_[:, bar], target_px), 'target')
+            in_trade &= ~(hit_stop | hit_target)
+
+        # New entries on this bar's close for flat symbols
+        enter = ~in_trade & signals[:, bar]
+        if bar < n_bars - 1 and enter.any():
+            entry_idx[enter] = bar
+            entry_px[enter] = close[enter, bar]
+            stop_px[enter] = close[enter, bar] - stop_atr * atr[enter, bar]
+            target_px[enter] = close[enter, bar] + target_atr * atr[enter, bar]
+            in_trade |= enter
+
+    if in_trade.any():
+        record(in_trade, n_bars - 1, close[:, -1], 'end')
+
+    return {
+        k: np.concatenate(v) if v else np.empty(0, dtype=np.int64 if k != 'reason' else object)
+        for k, v in trades.items()
+    }
+
+
+def trade_stats(trades, risk_per_trade=RISK_PER_TRADE):
+    """
+    Hit rate, expectancy (in % and R multiples) and max drawdown of a trade list.
+
+    The drawdown is taken from a compounded equity curve where every trade,
+    in exit order, risks `risk_per_trade` of current equity between entry
+    and stop, so a -1R loss costs that fraction of the account.
+    """
+    if len(trades['entry']) == 0:
+        return {'trades': 0, 'hit_rate': np.nan, 'expectancy_pct': np.nan, 'expectancy_r': np.nan, 'max_drawdown_pct': 0.0}
+    returns = (trades['exit'] - trades['entry']) / trades['entry'] * 100
+    with np.errstate(invalid='ignore', divide='ignore'):
+        r_multiple = (trades['exit'] - trades['entry']) / (trades['entry'] - trades['stop'])
+
+    # Risk-sized, compounded equity curve in exit order
+    growth = 1 + risk_per_trade * np.nan_to_num(r_multiple[np.argsort(trades['exit_idx'], kind='stable')])
+    equity = np.cumprod(np.maximum(growth, 0.0))
+    peak = np.maximum.accumulate(np.concatenate([[1.0], equity]))[1:]
+    drawdown = (peak - equity) / peak * 100
+
+    return {
+        'trades': len(returns),
+        'hit_rate': float(np.mean(returns > 0)),
+        'expectancy_pct': float(returns.mean()),
+        'expectancy_r': float(np.nanmean(r_multiple)),
+        'max_drawdown_pct': float(drawdown.max()),
+    }
+
+
+def run_backtest(symbols, panel, timestamps=None, indicators=None, **rules):
+    """
+    Apply the evaluate_trade rules to every bar of a (symbols x bars) panel.
+
+    Returns {'trades': DataFrame, 'stats': dict}. `timestamps` is an optional
+    int64 nanosecond panel used to label entry/exit times.
+    """
+    rules = {**DEFAULT_RULES, **rules}
+    if indicators is None:
+        indicators = compute_indicators(panel['high'], panel['low'], panel['close'], panel['volume'])
+    signals = signal_mask(indicators, rules['adx_min'], rules['rvol_min'])
+    trades = simulate_trades(panel, indicators['atr'], signals, rules['stop_atr'], rules['target_atr'])
+
+    table = pd.DataFrame({
+        'ticker': np.asarray(symbols, dtype=object)[trades['row']],
+        'entry_bar': trades['entry_idx'],
+        'exit_bar': trades['exit_idx'],
+        'entry': trades['entry'],
+        'stop_loss': trades['stop'],
+        'target': trades['target'],
+        'exit': trades['exit'],
+        'exit_reason': trades['reason'],
+    })
+    table['return_pct'] = (table['exit'] - table['entry']) / table['entry'] * 100
+    if timestamps is not None:
+        table['entry_time'] = pd.to_datetime(timestamps[trades['row'], trades['entry_idx']], utc=True)
+        table['exit_time'] = pd.to_datetime(timestamps[trades['row'], trades['exit_idx']], utc=True)
+    return {'trades': table, 'stats': trade_stats(trades)}
+
+
+def timestamp_panel(frames, symbols, n_bars):
+    """Right-aligned int64 nanosecond timestamps matching build_panel (padding is NaT)"""
+    ts = np.full((len(symbols), n_bars), np.iinfo(np.int64).min, dtype=np.int64)
+    for row, symbol in enumerate(symbols):
+        values = pd.DatetimeIndex(frames[symbol].index).as_unit('ns').asi8
+        ts[row, n_bars - len(values):] = values
+    return ts
+
+
+def backtest_frames(frames, **rules):
+    """Backtest a {symbol: OHLC DataFrame} mapping"""
+    symbols, panel = build_panel(frames)
+    timestamps = timestamp_panel(frames, symbols, panel['close'].shape[1])
+    return run_backtest(symbols, panel, timestamps=timestamps, **rules)
+
+
+def benchmark(n_symbols=2000, n_bars=2500):
+    """Ten years of daily bars for a large synthetic universe"""
+    frames = synthetic_frames(n_symbols, n_bars)
+    symbols, panel = build_panel(frames)
+
+    start = time.perf_counter()
+    result = run_backtest(symbols, panel)
+    elapsed = time.perf_counter() - start
+
+    print(f"{n_symbols} symbols x {n_bars} bars backtested in {elapsed:.2f}s")
+    print(result['stats'])
+    return elapsed
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,399 @@
+"""
+Offline throughput benchmark for SwingTraderPro.
+
+Runs the scanner against a local stand-in for the Upstox API (with
+configurable latency and error rate) and a stubbed fundamentals source,
+then writes symbols/sec, per-symbol latency percentiles and per-stage
+timings as JSON so runs can be compared. Per-symbol latency is the
+symbol's own work (its candle or fundamentals fetch, whichever is slower,
+plus evaluate_trade), not time spent queued behind other symbols:
+
+    python benchmark.py --sizes 10 100 1000 --latency 0.02 --out bench.json
+    python benchmark.py --sizes 100 --baseline bench.json
+    python benchmark.py --startup   # exits non-zero if over config.startup_budget
+"""
+import argparse
+import contextlib
+import csv
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from collections import defaultdict
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import numpy as np
+
+from instruments import InstrumentIndex, build_index
+from config import startup_budget
+from ratelimit import RateLimiter
+from sampletest import SwingTraderPro
+
+SECTORS = ['Banking', 'Technology', 'Pharmaceuticals', 'FMCG', 'Automobile', 'Oil & Gas']
+
+
+def synthetic_candles(instrument_key, n_bars=100, end=None):
+    """Deterministic daily candles for a key, newest first like the Upstox API"""
+    rng = np.random.default_rng(zlib.crc32(instrument_key.encode()))
+    end = end or datetime.now().date()
+    close = 100 * np.exp(np.cumsum(rng.normal(0.001, 0.02, n_bars)))
+    spread = close * rng.uniform(0.002, 0.03, n_bars)
+    volume = rng.integers(10_000, 1_000_000, n_bars)
+    candles = []
+    for i in range(n_bars):
+        day = end - timedelta(days=n_bars - 1 - i)
+        candles.append([
+            f"{day:%Y-%m-%d}T00:00:00+05:30",
+            round(float(close[i] - spread[i] / 2), 2), round(float(close[i] + spread[i]), 2),
+            round(float(close[i] - spread[i]), 2), round(float(close[i]), 2), int(volume[i]), 0
+        ])
+    return candles[::-1]
+
+
+class FakeUpstoxServer:
+    """
+    Local HTTP stand-in for /user/profile, /historical-candle and
+    /market-quote/quotes. Responses come from `fixtures_dir` when a recorded
+    fixture exists for the instrument key, otherwise from synthetic_candles.
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, n_bars=100, fixtures_dir=None, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.n_bars = n_bars
+        self.fixtures_dir = fixtures_dir
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = defaultdict(int)
+        self.responses = {}
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _candles(self, instrument_key):
+        if instrument_key not in self.responses:
+            path = self.fixtures_dir and os.path.join(self.fixtures_dir, f"{instrument_key.replace('|', '_')}.json")
+            if path and os.path.exists(path):
+                with open(path) as f:
+                    body = f.read().encode()
+            else:
+                body = json.dumps({'status': 'success', 'data': {'candles': synthetic_candles(instrument_key, self.n_bars)}}).encode()
+            self.responses[instrument_key] = body
+        return self.responses[instrument_key]
+
+    def _quotes(self, keys):
+        data = {}
+        for key in keys:
+            latest = json.loads(self._candles(key))['data']['candles'][0]
+            data[f"{key.split('|')[0]}:{key.split('|')[-1]}"] = {
+                'instrument_token': key,
+                'timestamp': latest[0],
+                'last_price': latest[4],
+                'volume': latest[5],
+                'ohlc': {'open': latest[1], 'high': latest[2], 'low': latest[3], 'close': latest[4]},
+            }
+        return json.dumps({'status': 'success', 'data': data}).encode()
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are separate writes; with Nagle on, delayed ACKs add ~40 ms per keep-alive request
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                with fake.lock:
+                    fake.requests[url.path.split('/')[1]] += 1
+                    fail = fake.random.random() < fake.error_rate
+                if fake.latency:
+                    time.sleep(fake.latency)
+
+                if fail:
+                    return self._send(500, b'{"status":"error","message":"Injected failure"}')
+                if url.path.startswith('/user/profile'):
+                    return self._send(200, b'{"status":"success","data":{"user_name":"benchmark"}}')
+                if url.path.startswith('/historical-candle/'):
+                    instrument_key = unquote(url.path.split('/')[2])
+                    return self._send(200, fake._candles(instrument_key))
+                if url.path.startswith('/market-quote/quotes'):
+                    keys = parse_qs(url.query).get('instrument_key', [''])[0].split(',')
+                    return self._send(200, fake._quotes([k for k in keys if k]))
+                return self._send(404, b'{"status":"error","message":"Not found"}')
+
+            def _send(self, status, body):
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+class BenchmarkTrader(SwingTraderPro):
+    """SwingTraderPro with a stubbed fundamentals source and per-stage timers"""
+
+    def __init__(self, *args, fundamentals_latency=0.0, **kwargs):
+        self.fundamentals_latency = fundamentals_latency
+        self.stage_lock = threading.Lock()
+        self.stages = defaultdict(float)
+        self.work = defaultdict(float)
+        self.latencies = []
+        self.local = threading.local()
+        super().__init__(*args, **kwargs)
+
+    def _add(self, stage, seconds):
+        with self.stage_lock:
+            self.stages[stage] += seconds
+
+    def _fetch_fundamentals_info(self, ticker):
+        start = time.perf_counter()
+        if self.fundamentals_latency:
+            time.sleep(self.fundamentals_latency)
+        rng = random.Random(ticker)
+        info = {'sector': rng.choice(SECTORS), 'debtToEquity': rng.uniform(0, 2), 'trailingPE': rng.uniform(5, 40)}
+        self._add('fundamentals', time.perf_counter() - start)
+        return info
+
+    def _get(self, url, **kwargs):
+        start = time.perf_counter()
+        response = super()._get(url, **kwargs)
+        elapsed = time.perf_counter() - start
+        self.local.fetch = getattr(self.local, 'fetch', 0.0) + elapsed
+        self._add('fetch', elapsed)
+        return response
+
+    def _fetch_candles(self, *args, **kwargs):
+        self.local.fetch = 0.0
+        start = time.perf_counter()
+        df = super()._fetch_candles(*args, **kwargs)
+        self._add('parse', time.perf_counter() - start - self.local.fetch)
+        return df
+
+    def _fetched(self, ticker, seconds):
+        # Candles and fundamentals are fetched concurrently, so the slower one counts
+        with self.stage_lock:
+            self.work[ticker] = max(self.work[ticker], seconds)
+
+    def get_candles(self, ticker, *args, **kwargs):
+        start = time.perf_counter()
+        result = super().get_candles(ticker, *args, **kwargs)
+        self._fetched(ticker, time.perf_counter() - start)
+        return result
+
+    def get_fundamentals(self, ticker, margin=0):
+        start = time.perf_counter()
+        result = super().get_fundamentals(ticker, margin)
+        self._fetched(ticker, time.perf_counter() - start)
+        return result
+
+    def get_technicals(self, ticker, df=None, interval='day'):
+        start = time.perf_counter()
+        result = super().get_technicals(ticker, df=df, interval=interval)
+        self.local.indicators = time.perf_counter() - start
+        self._add('indicators', self.local.indicators)
+        return result
+
+    def evaluate_trade(self, ticker, *args, **kwargs):
+        self.local.indicators = 0.0
+        start = time.perf_counter()
+        result = super().evaluate_trade(ticker, *args, **kwargs)
+        end = time.perf_counter()
+        self._add('decision', end - start - self.local.indicators)
+        with self.stage_lock:
+            self.latencies.append(self.work.pop(ticker, 0.0) + end - start)
+        return result
+
+
+def make_instrument_index(symbols, index_dir):
+    """Build an instrument index for synthetic symbols so lookups use the real path"""
+    master = os.path.join(index_dir, 'master.csv')
+    with open(master, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['instrument_key', 'tradingsymbol', 'name', 'exchange', 'instrument_type', 'lot_size', 'tick_size'])
+        for i, symbol in enumerate(symbols):
+            writer.writerow([f"NSE_EQ|INE{i:07d}01", symbol, symbol, 'NSE_EQ', 'EQUITY', 1, 0.05])
+    build_index(master, index_dir)
+    return InstrumentIndex(index_dir)
+
+
+def run_benchmark(n_symbols, latency=0.0, error_rate=0.0, fundamentals_latency=0.0, workers=8, n_bars=100, fixtures_dir=None):
+    """Scan `n_symbols` synthetic symbols against the fake server and return the measurements"""
+    symbols = [f"SYN{i:05d}" for i in range(n_symbols)]
+    with FakeUpstoxServer(latency, error_rate, n_bars, fixtures_dir) as server, tempfile.TemporaryDirectory() as tmp:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            trader = BenchmarkTrader(
+                'benchmark', 'benchmark', base_url=server.base_url, max_workers=workers,
+                candle_store_dir=None, fundamentals_cache_path=None, journal_dir=None,
+                fundamentals_latency=fundamentals_latency
+            )
+            trader.instruments = make_instrument_index(symbols, tmp)
+            trader.rate_limiter = RateLimiter([])
+
+            start = time.perf_counter()
+            results = trader.scan(symbols)
+            elapsed = time.perf_counter() - start
+
+    latencies = np.array(trader.latencies) if trader.latencies else np.array([np.nan])
+    decisions = defaultdict(int)
+    for result in results:
+        decisions[result['decision']] += 1
+    return {
+        'n_symbols': n_symbols,
+        'seconds': elapsed,
+        'symbols_per_sec': n_symbols / elapsed,
+        'latency_p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'latency_p99_ms': float(np.percentile(latencies, 99) * 1000),
+        'stage_seconds': dict(trader.stages),
+        'stage_ms_per_symbol': {k: v / n_symbols * 1000 for k, v in trader.stages.items()},
+        'decisions': dict(decisions),
+        'requests': dict(server.requests),
+    }
+
+
+def record_fixtures(trader, watchlist, fixtures_dir, days_back=100):
+    """Save live /historical-candle responses so the fake server can replay them"""
+    os.makedirs(fixtures_dir, exist_ok=True)
+    to_date = datetime.now().date()
+    from_date = to_date - timedelta(days=days_back)
+    for symbol in watchlist:
+        instrument = trader._get_instrument_details(symbol)
+        if not instrument:
+            continue
+        key = instrument['instrument_key']
+        response = trader._get(f"{trader.base_url}/historical-candle/{key.replace('|', '%7C')}/day/{to_date}/{from_date}")
+        if response.status_code == 200:
+            with open(os.path.join(fixtures_dir, f"{key.replace('|', '_')}.json"), 'w') as f:
+                f.write(response.text)
+
+
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import sampletest
+imported = time.perf_counter()
+trader = sampletest.SwingTraderPro(
+    'benchmark', 'benchmark', base_url=sys.argv[1], candle_store_dir=None,
+    fundamentals_cache_path=None, journal_dir=None, connection_check='background'
+)
+trader._fetch_fundamentals_info = lambda ticker: {'sector': 'Banking', 'debtToEquity': 1.0, 'trailingPE': 12.0}
+decision = trader.evaluate_trade('HDFCBANK', print_stats=False)
+done = time.perf_counter()
+trader.wait_for_connection()
+print(json.dumps({'import_seconds': imported - start, 'first_signal_seconds': done - start, 'decision': decision['decision']}))
+"""
+
+
+def measure_startup(latency=0.02):
+    """Import time and time to first signal in a fresh interpreter against the fake server"""
+    with FakeUpstoxServer(latency) as server:
+        begin = time.perf_counter()
+        proc = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT, server.base_url],
+                              capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        wall = time.perf_counter() - begin
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr)
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['process_seconds'] = wall
+    return result
+
+
+def check_startup_budget(latency=0.02, budget=startup_budget):
+    """Measure startup and return (result, list of budget violations)"""
+    result = measure_startup(latency)
+    violations = [
+        f"{key} {result[key]:.3f}s > {limit:.3f}s"
+        for key, limit in budget.items() if result.get(key, 0) > limit
+    ]
+    return result, violations
+
+
+def compare(current, baseline):
+    """Print throughput and latency changes against a previous results file"""
+    previous = {run['n_symbols']: run for run in baseline['runs']}
+    for run in current['runs']:
+        old = previous.get(run['n_symbols'])
+        if not old:
+            continue
+        change = (run['symbols_per_sec'] / old['symbols_per_sec'] - 1) * 100
+        print(f"{run['n_symbols']:>5} symbols: {old['symbols_per_sec']:.1f} -> {run['symbols_per_sec']:.1f} sym/s ({change:+.1f}%), "
+              f"p99 {old['latency_p99_ms']:.1f} -> {run['latency_p99_ms']:.1f} ms")
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 5000])
+    parser.add_argument('--latency', type=float, default=0.02, help="server latency per request in seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--fundamentals-latency', type=float, default=0.0)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--bars', type=int, default=100)
+    parser.add_argument('--fixtures', default=None, help="directory of recorded historical-candle responses")
+    parser.add_argument('--out', default='benchmark_results.json')
+    parser.add_argument('--baseline', default=None, help="previous results file to compare against")
+    parser.add_argument('--startup', action='store_true', help="check import / first-signal latency against config.startup_budget")
+    args = parser.parse_args()
+
+    if args.startup:
+        result, violations = check_startup_budget(args.latency)
+        print(f"import {result['import_seconds']:.3f}s, first signal {result['first_signal_seconds']:.3f}s, "
+              f"process {result['process_seconds']:.3f}s")
+        for violation in violations:
+            print(f"Startup budget exceeded: {violation}")
+        sys.exit(1 if violations else 0)
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': _git_revision(),
+        'config': {k: v for k, v in vars(args).items() if k not in ('out', 'baseline')},
+        'runs': [],
+    }
+    for size in args.sizes:
+        run = run_benchmark(size, args.latency, args.error_rate, args.fundamentals_latency, args.workers, args.bars, args.fixtures)
+        report['runs'].append(run)
+        print(f"{size:>5} symbols: {run['symbols_per_sec']:.1f} sym/s, p50 {run['latency_p50_ms']:.1f} ms, "
+              f"p99 {run['latency_p99_ms']:.1f} ms, stages(ms/symbol) "
+              + ", ".join(f"{k}={v:.2f}" for k, v in run['stage_ms_per_symbol'].items()))
+
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+import json
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+CANDLE_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'oi']
+RECORD_DTYPE = np.dtype([('ts', '<i8')] + [(col, '<f8') for col in CANDLE_COLUMNS])
+MARKET_TZ = 'Asia/Kolkata'
+
+
+class CandleStore:
+    """
+    On-disk candle store keyed by (instrument_key, interval).
+
+    Each series is a flat binary file of fixed-size records sorted by
+    timestamp, so new bars are appended in place and history is read back
+    with a single np.fromfile instead of being re-parsed. A small JSON
+    index tracks the date coverage, last refresh and last access per series;
+    it is kept in memory and written at most every `save_interval` seconds,
+    or explicitly via flush() at the end of a batch.
+
+    `max_bars` is an int or a {interval: bars} dict with a 'default' key.
+    Compaction never trims a series below the window of its largest
+    back-fill, so a requested window is not dropped and re-fetched.
+    """
+
+    def __init__(self, root, max_bars=5000, max_bytes=512 * 1024 * 1024, save_interval=5.0):
+        self.root = root
+        self.max_bars = max_bars
+        self.max_bytes = max_bytes
+        self.save_interval = save_interval
+        self.lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self.index_path = os.path.join(root, 'index.json')
+        self.index = self._load_index()
+        self.total_bytes = sum(entry.get('bytes', 0) for entry in self.index.values())
+        self.dirty = False
+        self.last_save = time.time()
+
+    # ------------------------------------------------------------------ paths
+    def _series_id(self, instrument_key, interval):
+        return f"{instrument_key}|{interval}"
+
+    def _max_bars(self, instrument_key, interval):
+        limit = self.max_bars.get(interval, self.max_bars['default']) if isinstance(self.max_bars, dict) else self.max_bars
+        entry = self.index.get(self._series_id(instrument_key, interval), {})
+        return max(limit, entry.get('window_bars', 0))
+
+    def _path(self, instrument_key, interval):
+        safe_key = instrument_key.replace('|', '_').replace('/', '_')
+        return os.path.join(self.root, interval, f"{safe_key}.bin")
+
+    def _load_index(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+        self.dirty = False
+        self.last_save = time.time()
+
+    def flush(self):
+        """Write the index to disk if it changed since the last save"""
+        with self.lock:
+            if self.dirty:
+                self._save_index()
+
+    def _touch(self, series_id, **fields):
+        entry = self.index.setdefault(series_id, {})
+        entry['accessed'] = time.time()
+        entry.update(fields)
+        self.dirty = True
+
+    # ------------------------------------------------------------------ read
+    def _records(self, instrument_key, interval):
+        path = self._path(instrument_key, interval)
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.fromfile(path, dtype=RECORD_DTYPE)
+
+    def _last_ts(self, instrument_key, interval):
+        path = self._path(instrument_key, interval)
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return None
+        with open(path, 'rb') as f:
+            f.seek(-RECORD_DTYPE.itemsize, os.SEEK_END)
+            return int(np.fromfile(f, dtype=RECORD_DTYPE, count=1)['ts'][0])
+
+    def read(self, instrument_key, interval, start=None, end=None):
+        """Return stored candles as a DataFrame indexed by timestamp"""
+        # Under the lock so a concurrent write cannot hand back a half-truncated file
+        with self.lock:
+            records = self._records(instrument_key, interval)
+            self._touch(self._series_id(instrument_key, interval))
+        lo, hi = 0, len(records)
+        if start is not None:
+            lo = int(np.searchsorted(records['ts'], _to_ns(start), side='left'))
+        if end is not None:
+            hi = int(np.searchsorted(records['ts'], _to_ns(end), side='right'))
+        return records_to_frame(records[lo:hi])
+
+    def missing_ranges(self, instrument_key, interval, from_date, to_date, refresh_seconds=0):
+        """
+        Return the (from_date, to_date) ranges that still need to be fetched.
+        The last stored bar is always re-requested so a partial bar is refreshed,
+        unless the series was refreshed within `refresh_seconds`. A window that
+        starts after the last stored bar is fetched on its own, not the gap.
+        """
+        from_date, to_date = pd.Timestamp(from_date).date(), pd.Timestamp(to_date).date()
+        with self.lock:
+            entry = dict(self.index.get(self._series_id(instrument_key, interval)) or {})
+            last_ts = self._last_ts(instrument_key, interval)
+        if not entry or last_ts is None:
+            return [(from_date, to_date)]
+        if from_date > _market_date(last_ts):
+            return [(from_date, to_date)]
+
+        ranges = []
+        covered_from = pd.Timestamp(entry['covered_from']).date()
+        if from_date < covered_from:
+            ranges.append((from_date, covered_from - pd.Timedelta(days=1)))
+
+        last_bar = _market_date(last_ts)
+        fresh = time.time() - entry.get('updated', 0) < refresh_seconds
+        if to_date >= last_bar and not fresh:
+            ranges.append((last_bar, to_date))
+        return ranges
+
+    # ------------------------------------------------------------------ write
+    def write(self, instrument_key, interval, df, covered_from=None, refreshed=True):
+        """
+        Merge new candles into the series, appending in place when possible.
+        Pass refreshed=False for bars that did not come from a history fetch
+        (e.g. a live quote patch) so they do not reset the refresh clock.
+        """
+        new = frame_to_records(df)
+        path = self._path(instrument_key, interval)
+        series_id = self._series_id(instrument_key, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with self.lock:
+            existing = self._records(instrument_key, interval)
+            if len(new) == 0:
+                open(path, 'ab').close()
+            elif len(existing) == 0 or new['ts'][0] > existing['ts'][0]:
+                # Drop stored bars the new batch replaces (e.g. today's partial bar), then append
+                keep = int(np.searchsorted(existing['ts'], new['ts'][0], side='left'))
+                with open(path, 'ab') as f:
+                    f.truncate(keep * RECORD_DTYPE.itemsize)
+                    f.seek(0, os.SEEK_END)
+                    new.tofile(f)
+            else:
+                # Back-fill of older history: rewrite the merged series
+                self._rewrite(path, _merge(existing, new))
+
+            entry = self.index.get(series_id, {})
+            old_bytes = entry.get('bytes', 0)
+            window_bars = entry.get('window_bars', 0)
+            if covered_from is not None:
+                covered_from = str(pd.Timestamp(covered_from).date())
+                # Remember how many bars this window holds so compaction keeps all of it
+                stamps = np.concatenate([existing['ts'], new['ts']])
+                window_bars = max(window_bars, len(np.unique(stamps[stamps >= _to_ns(covered_from)])))
+                # A window starting after the stored history leaves a gap, so coverage restarts there
+                disjoint = len(existing) and covered_from > str(_market_date(existing['ts'][-1]))
+                if entry.get('covered_from') and not disjoint:
+                    covered_from = min(covered_from, entry['covered_from'])
+            else:
+                covered_from = entry.get('covered_from')
+            fields = {'updated': time.time()} if refreshed else {}
+            self._touch(series_id, covered_from=covered_from, bytes=os.path.getsize(path), window_bars=window_bars, **fields)
+            self.total_bytes += self.index[series_id]['bytes'] - old_bytes
+
+            if os.path.getsize(path) > self._max_bars(instrument_key, interval) * RECORD_DTYPE.itemsize * 2:
+                self._compact(instrument_key, interval)
+            if self.total_bytes > self.max_bytes:
+                self._enforce_size_limit()
+            if time.time() - self.last_save >= self.save_interval:
+                self._save_index()
+
+    def _rewrite(self, path, records):
+        tmp_path = f"{path}.tmp"
+        records.tofile(tmp_path)
+        os.replace(tmp_path, path)
+
+    # ------------------------------------------------------------ maintenance
+    def _compact(self, instrument_key, interval):
+        path = self._path(instrument_key, interval)
+        records = self._records(instrument_key, interval)
+        records = _merge(records[:0], records)
+        max_bars = self._max_bars(instrument_key, interval)
+        dropped = records[:-max_bars][-1:] if len(records) > max_bars else records[:0]
+        records = records[-max_bars:]
+        self._rewrite(path, records)
+        entry = self.index.setdefault(self._series_id(instrument_key, interval), {})
+        self.total_bytes += os.path.getsize(path) - entry.get('bytes', 0)
+        entry['bytes'] = os.path.getsize(path)
+        if len(dropped):
+            # Older history was dropped, so coverage now starts at the first fully kept day
+            first_bar = _market_date(records['ts'][0])
+            if _market_date(dropped['ts'][0]) == first_bar:
+                first_bar += pd.Timedelta(days=1)
+            entry['covered_from'] = str(first_bar)
+
+    def compact(self):
+        """Sort, de-duplicate and trim every series to `max_bars`, then apply the size bound"""
+        with self.lock:
+            for series_id in list(self.index):
+                instrument_key, interval = series_id.rsplit('|', 1)
+                if os.path.exists(self._path(instrument_key, interval)):
+                    self._compact(instrument_key, interval)
+                else:
+                    self.total_bytes -= self.index.pop(series_id).get('bytes', 0)
+            self._enforce_size_limit()
+            self._save_index()
+
+    def _enforce_size_limit(self):
+        """Evict least recently accessed series until the store fits in `max_bytes`"""
+        for series_id in sorted(self.index, key=lambda s: self.index[s].get('accessed', 0)):
+            if self.total_bytes <= self.max_bytes:
+                break
+            instrument_key, interval = series_id.rsplit('|', 1)
+            self.total_bytes -= self.index[series_id].get('bytes', 0)
+            try:
+                os.remove(self._path(instrument_key, interval))
+            except OSError:
+                pass
+            del self.index[series_id]
+        self.dirty = True
+
+    def size(self):
+        """Total bytes held on disk"""
+        return self.total_bytes
+
+
+def _to_ns(value):
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize(MARKET_TZ)
+    return ts.value
+
+
+def _market_date(ts):
+    return pd.Timestamp(int(ts), tz='UTC').tz_convert(MARKET_TZ).date()
+
+
+def _merge(existing, new):
+    """Sorted union of two record arrays; rows from `new` win on duplicate timestamps"""
+    combined = np.concatenate([new, existing])
+    _, first = np.unique(combined['ts'], return_index=True)
+    return combined[first]
+
+
+def frame_to_records(df):
+    """Convert a get_ohlc_data style DataFrame into store records"""
+    records = np.empty(len(df), dtype=RECORD_DTYPE)
+    if len(df) == 0:
+        return records
+    records['ts'] = pd.DatetimeIndex(df.index).as_unit('ns').asi8
+    for col in CANDLE_COLUMNS:
+        records[col] = df[col].to_numpy(dtype=np.float64) if col in df else 0.0
+    return records[np.argsort(records['ts'], kind='stable')]
+
+
+def records_to_frame(records):
+    """Convert store records back into a get_ohlc_data style DataFrame"""
+    index = pd.DatetimeIndex(pd.to_datetime(records['ts'], unit='ns', utc=True), name='timestamp')
+    return pd.DataFrame({col: records[col] for col in CANDLE_COLUMNS}, index=index.tz_convert(MARKET_TZ))
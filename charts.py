@@ -0,0 +1,163 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from config import chart_size, chart_dpi
+
+SERIES = ['close', '9_ema', '21_ema', '50_ema', 'volume', '20_day_vol', 'adx', 'plus_di', 'minus_di']
+
+_renderer = None
+
+
+def downsample(x, columns, max_points):
+    """
+    Min/max decimation to at most ~3 points per bucket: each bucket keeps the
+    lowest and highest close and the largest volume, so peaks survive on a
+    chart that has fewer pixels than bars. Returns (x, columns) unchanged when
+    the series already fits.
+    """
+    n = len(x)
+    buckets = max(max_points // 3, 1)
+    if n <= max_points or n <= buckets:
+        return x, columns
+    width = -(-n // buckets)
+    pad = buckets * width - n
+
+    def rows(values, fill):
+        values = np.where(np.isnan(values), fill, values)
+        return np.concatenate([values, np.full(pad, fill)]).reshape(buckets, width)
+
+    starts = np.arange(buckets) * width
+    close = columns['close'].astype(np.float64)
+    volume = columns['volume'].astype(np.float64)
+    picks = np.concatenate([
+        starts + rows(close, np.inf).argmin(axis=1),
+        starts + rows(close, -np.inf).argmax(axis=1),
+        starts + rows(volume, -np.inf).argmax(axis=1),
+        [0, n - 1],
+    ])
+    keep = np.unique(np.clip(picks, 0, n - 1))
+    return x[keep], {name: values[keep] for name, values in columns.items()}
+
+
+def chart_payload(df, max_points=None):
+    """Plain arrays for one indicator frame (wall-clock market time), downsampled to `max_points`"""
+    index = df.index.tz_localize(None) if df.index.tz is not None else df.index
+    x = index.to_numpy(dtype='datetime64[ns]')
+    columns = {name: df[name].to_numpy(dtype=np.float64) for name in SERIES}
+    if max_points:
+        x, columns = downsample(x, columns, max_points)
+    return x, columns
+
+
+class ChartRenderer:
+    """
+    Three-panel price/EMA, volume and ADX/DI chart drawn on one reusable
+    Agg figure. Lines are created once and only their data is swapped per
+    symbol, so no pyplot state or GUI backend is involved.
+    """
+
+    def __init__(self, size=chart_size, dpi=chart_dpi):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        self.figure = Figure(figsize=size, dpi=dpi)
+        FigureCanvasAgg(self.figure)
+        self.price_ax, self.volume_ax, self.trend_ax = self.figure.subplots(3, 1, sharex=True)
+
+        self.lines = {
+            'close': self.price_ax.plot([], [], label='Price', color='black', linewidth=1.5)[0],
+            '9_ema': self.price_ax.plot([], [], label='9 EMA', color='blue', alpha=0.8)[0],
+            '21_ema': self.price_ax.plot([], [], label='21 EMA', color='orange', alpha=0.8)[0],
+            '50_ema': self.price_ax.plot([], [], label='50 EMA', color='red', alpha=0.8)[0],
+            '20_day_vol': self.volume_ax.plot([], [], color='red', linewidth=2, label='20D Avg Volume')[0],
+            'adx': self.trend_ax.plot([], [], label='ADX (Trend Strength)', color='green', linewidth=2)[0],
+            'plus_di': self.trend_ax.plot([], [], label='+DI', color='blue', linestyle='--')[0],
+            'minus_di': self.trend_ax.plot([], [], label='-DI', color='red', linestyle='--')[0],
+        }
+        self.volume_bars = None
+        self.trend_ax.axhline(25, color='gray', linestyle=':', label='Trend Threshold (25)')
+
+        self.volume_ax.set_title("Volume Analysis", fontweight='bold')
+        self.trend_ax.set_title("Trend Strength Analysis", fontweight='bold')
+        for ax in (self.price_ax, self.volume_ax, self.trend_ax):
+            ax.grid(True, alpha=0.3)
+        # Fixed margins: a tight layout pass per symbol would cost more than the drawing itself
+        self.figure.subplots_adjust(left=0.07, right=0.98, top=0.96, bottom=0.05, hspace=0.3)
+
+    @property
+    def max_points(self):
+        """Horizontal pixel count of the figure; longer series are downsampled to this"""
+        return int(self.figure.get_figwidth() * self.figure.dpi)
+
+    def render(self, ticker, x, columns, path):
+        for name, line in self.lines.items():
+            line.set_data(x, columns[name])
+
+        if self.volume_bars is not None:
+            self.volume_bars.remove()
+        self.volume_bars = self.volume_ax.fill_between(
+            x, columns['volume'], step='mid', color='purple', alpha=0.6, label='Daily Volume'
+        )
+
+        self.price_ax.set_title(f"{ticker} Price Analysis", fontweight='bold')
+        for ax in (self.price_ax, self.volume_ax, self.trend_ax):
+            ax.relim()
+            ax.autoscale_view()
+            ax.legend(loc='upper left')
+        self.figure.savefig(path)
+        return path
+
+
+def _init_worker(size, dpi):
+    global _renderer
+    _renderer = ChartRenderer(size, dpi)
+
+
+def _render_task(task):
+    ticker, x, columns, path = task
+    return ticker, _renderer.render(ticker, x, columns, path)
+
+
+def render_charts(frames, output_dir, fmt='png', workers=None, size=chart_size, dpi=chart_dpi):
+    """
+    Write one chart per indicator frame in `frames` ({ticker: DataFrame from
+    technicals_frame}) to `output_dir`/<ticker>.<fmt> across a process pool.
+    Each worker keeps a single figure for all the symbols it draws. Returns
+    {ticker: path}.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    max_points = int(size[0] * dpi)
+    tasks = []
+    for ticker, df in frames.items():
+        if df is None or df.empty:
+            print(f"No data for {ticker}")
+            continue
+        x, columns = chart_payload(df, max_points)
+        tasks.append((ticker, x, columns, os.path.join(output_dir, f"{ticker}.{fmt}")))
+
+    workers = min(workers or os.cpu_count(), max(len(tasks), 1))
+    if workers == 1:
+        _init_worker(size, dpi)
+        return dict(map(_render_task, tasks))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(size, dpi)) as pool:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        return dict(pool.map(_render_task, tasks, chunksize=chunksize))
+
+
+def benchmark(n_symbols=50, n_bars=5000, output_dir='charts/benchmark'):
+    """Render synthetic charts with one worker and with every core"""
+    from indicators import synthetic_frames, technicals_frame
+
+    frames = {ticker: technicals_frame(df) for ticker, df in synthetic_frames(n_symbols, n_bars).items()}
+    timings = {}
+    for workers in sorted({1, os.cpu_count()}):
+        start = time.perf_counter()
+        render_charts(frames, output_dir, workers=workers)
+        timings[workers] = time.perf_counter() - start
+        print(f"{n_symbols} charts x {n_bars} bars, {workers} worker(s): {timings[workers]:.2f}s")
+    return timings
+
+
+if __name__ == "__main__":
+    benchmark()
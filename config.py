@@ -1,5 +1,64 @@
 
 base_url = "https://api.upstox.com/v2"
+# Upstox standard API quotas as (requests, seconds)
+rate_limits = [(50, 1), (500, 60), (2000, 1800)]
+scan_workers = 8
+# "eager" verifies /user/profile in the constructor; "background" overlaps it with the first fetches
+connection_check = "eager"
+# Enforced by `python benchmark.py --startup` (seconds, measured in a fresh interpreter)
+startup_budget = {"import_seconds": 1.0, "first_signal_seconds": 1.5, "process_seconds": 2.0}
+# Local OHLC candle store; bars refreshed within candle_refresh_seconds are not re-requested
+candle_store_dir = "data/candles"
+candle_refresh_seconds = 60
+# Bars kept per series before compaction; a series also keeps at least the window it was last back-filled for
+candle_max_bars = {"day": 5000, "1minute": 30000, "default": 5000}
+# Decoded OHLC column type; "float32" halves memory for long intraday histories
+candle_dtype = "float64"
+# Multi-timeframe confirmation: bars resampled from one 1-minute fetch per symbol
+mtf_timeframes = ["15minute", "60minute"]
+mtf_days_back = 30
+# Screening funnel (SwingTraderPro.screen): bulk-quote prefilter gates and result size
+screen_rules = {"min_price": 20, "max_price": 50000, "min_turnover": 1e7, "min_avg_volume": 100000}
+screen_top_k = 20
+quote_batch_size = 500  # Max instrument keys per /market-quote/quotes request
+# Append-only columnar journal of every scan decision, one directory per date (None disables)
+journal_dir = "data/journal"
+# Resident scanning daemon (python daemon.py): scans at each bar close during NSE hours
+daemon_interval_minutes = 15
+daemon_close_delay = 5  # Seconds after the bar close before scanning, so the last ticks are in
+daemon_state_path = "data/daemon_state.pkl"
+daemon_lock_path = "data/daemon.lock"
+daemon_fundamentals_margin = 3600  # Seconds; fundamentals expiring this soon are refetched in parallel before a cycle
+# NSE trading holidays (weekends are closed anyway); update from the yearly NSE circular
+market_holidays = [
+    "2025-02-26", "2025-03-14", "2025-03-31", "2025-04-10", "2025-04-14", "2025-04-18", "2025-05-01",
+    "2025-08-15", "2025-08-27", "2025-10-02", "2025-10-21", "2025-10-22", "2025-11-05", "2025-12-25",
+    "2026-01-26", "2026-03-03", "2026-03-26", "2026-03-31", "2026-04-03", "2026-04-14", "2026-05-01",
+    "2026-05-28", "2026-06-26", "2026-09-14", "2026-10-02", "2026-10-20", "2026-11-10", "2026-11-24",
+    "2026-12-25",
+]
+# Max memoized candle/indicator frames held in memory
+analysis_cache_size = 512
+# Universe panel (SwingTraderPro.load_panel): bars kept per symbol, storage type and memory budget
+panel_lookback = 250
+panel_dtype = "float32"
+panel_bytes_per_symbol = 32 * 1024
+# Instrumentation: metrics are off unless enabled here or a metrics_port is set
+metrics_enabled = False
+metrics_port = None  # e.g. 9108 serves /metrics and /metrics.json
+profile_output = None  # e.g. "profile.collapsed" to sample stacks during a run
+# Headless batch charts (SwingTraderPro.render_charts); format is "png" or "svg"
+chart_output_dir = "charts"
+chart_format = "png"
+chart_size = (12, 10)
+chart_dpi = 100
+# Disk-backed yfinance fundamentals cache with per-field TTLs in seconds
+fundamentals_cache_path = "data/fundamentals.json"
+fundamentals_ttl = {
+    'sector': 7 * 24 * 3600,
+    'debtToEquity': 24 * 3600,
+    'trailingPE': 24 * 3600,
+}
 access_token = ""
 client_id = ""
 sector_params = {
@@ -31,6 +90,9 @@ sector_params = {
             
             "default": {"debt_equity_max": 0.8, "pe_max": 25, "interest_coverage": 3}
         }
+# Instrument master index built by instruments.py from the Upstox master file
+instrument_index_dir = "data/instruments"
+instrument_master_url = "https://assets.upstox.com/market-quote/instruments/exchange/complete.csv.gz"
 SYMBOL_TO_ISIN = {
         "RELIANCE": "INE002A01018",
         "TATASTEEL": "INE081A01012",
@@ -42,4 +104,14 @@ SYMBOL_TO_ISIN = {
     }
 
 account_sid = ""
-auth_token = ""
\ No newline at end of file
+auth_token = ""
+# BUY alerts: None, "twilio", "webhook", "file" or "stub"; sent from a background thread
+alert_transport = None
+alert_to = ""
+alert_from = ""
+alert_webhook_url = ""
+alert_file_path = "data/alerts.jsonl"
+alert_dedupe_seconds = 15 * 60  # Same ticker/decision is not re-sent within this window
+alert_batch_seconds = 2  # Signals arriving within this window go out as one message
+alert_max_retries = 3
+alert_queue_size = 1000
\ No newline at end of file
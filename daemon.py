@@ -0,0 +1,286 @@
+"""
+Resident scanning daemon.
+
+Keeps one SwingTraderPro with warm candles, fundamentals and streaming
+indicator state, and re-evaluates the watchlist at every bar close during
+NSE market hours. Each cycle costs one batched quotes request per 500
+symbols plus O(1) indicator updates per symbol.
+
+    python daemon.py [SYMBOL ...]     # defaults to config.SYMBOL_TO_ISIN
+
+SIGINT/SIGTERM stop it after the current cycle and save the indicator state,
+so a restart on the same trading day skips the history rebuild. The first
+cycle of a new session re-seeds every symbol from history, so the previous
+session's official close replaces its last intraday snapshot.
+"""
+import fcntl
+import os
+import pickle
+import signal
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from config import SYMBOL_TO_ISIN, client_id, access_token, market_holidays
+from config import daemon_interval_minutes, daemon_close_delay, daemon_state_path, daemon_lock_path, daemon_fundamentals_margin
+from metrics import metrics
+from streaming import QuoteFeed, STATE_VERSION
+from timeframes import SESSION_OPEN, SESSION_CLOSE
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+class MarketCalendar:
+    """NSE cash-market sessions: weekdays minus configured holidays, 09:15-15:30 IST"""
+
+    def __init__(self, holidays=market_holidays):
+        self.holidays = {date.fromisoformat(day) for day in holidays}
+
+    def covers(self, year):
+        """Whether any holiday is configured for `year` (otherwise every weekday counts as a session)"""
+        return any(day.year == year for day in self.holidays)
+
+    def is_trading_day(self, day):
+        return day.weekday() < 5 and day not in self.holidays
+
+    def session(self, day):
+        midnight = datetime(day.year, day.month, day.day, tzinfo=IST)
+        return midnight + timedelta(minutes=SESSION_OPEN), midnight + timedelta(minutes=SESSION_CLOSE)
+
+    def is_open(self, now):
+        now = now.astimezone(IST)
+        open_, close = self.session(now.date())
+        return self.is_trading_day(now.date()) and open_ <= now < close
+
+    def bar_closes(self, day, minutes):
+        """Close times of every `minutes` bar in the session; the last one ends at the session close"""
+        open_, close = self.session(day)
+        closes = []
+        t = open_ + timedelta(minutes=minutes)
+        while t < close:
+            closes.append(t)
+            t += timedelta(minutes=minutes)
+        closes.append(close)
+        return closes
+
+    def next_bar_close(self, now, minutes):
+        """First bar close strictly after `now`, skipping weekends and holidays"""
+        now = now.astimezone(IST)
+        day = now.date()
+        for _ in range(30):
+            if self.is_trading_day(day):
+                for t in self.bar_closes(day, minutes):
+                    if t > now:
+                        return t
+            day += timedelta(days=1)
+        raise RuntimeError("No trading session in the next 30 days; check market_holidays")
+
+
+class ScanDaemon:
+    """
+    Bar-close scheduler around a SwingTraderPro instance.
+
+    Cycles run one at a time on the thread that calls run(); a cycle that runs
+    past the next bar close simply skips it. A lock file keeps a second
+    daemon process from scanning at the same time.
+    """
+
+    def __init__(self, trader, watchlist, interval_minutes=daemon_interval_minutes, close_delay=daemon_close_delay,
+                 state_path=daemon_state_path, lock_path=daemon_lock_path, calendar=None,
+                 fundamentals_margin=daemon_fundamentals_margin):
+        self.trader = trader
+        self.watchlist = list(watchlist)
+        self.interval_minutes = interval_minutes
+        self.close_delay = close_delay
+        self.state_path = state_path
+        self.lock_path = lock_path
+        self.calendar = calendar or MarketCalendar()
+        self.fundamentals_margin = fundamentals_margin
+        self.stop_event = threading.Event()
+        self.feed = None
+        self.session_date = None  # IST date of the session the indicator states are current for
+        self.cycles = 0
+        self.skipped = 0
+        self.lock_file = None
+        self.checked_years = set()
+
+    # ------------------------------------------------------------------ state
+
+    def warm_up(self):
+        """Restore saved indicator state when it is still current, otherwise seed it from history"""
+        started = time.perf_counter()
+        states = {
+            key: state for key, state in (self._load_state() or {}).items() if state.symbol in self.watchlist
+        }
+        restored = {state.symbol for state in states.values()}
+        missing = [ticker for ticker in self.watchlist if ticker not in restored]
+        if missing:
+            states.update(self.trader.create_stream(missing).states)
+        self.feed = QuoteFeed(states)
+        self.session_date = datetime.now(IST).date()
+        self.trader.prefetch_fundamentals(self.watchlist, self.fundamentals_margin)
+        print(f"Warm-up: {len(restored)} symbols from saved state, {len(states) - len(restored)} from history "
+              f"in {time.perf_counter() - started:.1f}s")
+
+    def _load_state(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return None
+        try:
+            with open(self.state_path, 'rb') as f:
+                saved = pickle.load(f)
+        except Exception as e:
+            print(f"Ignoring unreadable daemon state: {str(e)}")
+            return None
+        if saved.get('version') != STATE_VERSION:
+            print("Saved state is from an older format, rebuilding from history")
+            return None
+        # An earlier session's last bar is an intraday snapshot, not the official close
+        if saved['trading_date'] != datetime.now(IST).date():
+            print(f"Saved state is from {saved['trading_date']}, rebuilding from history")
+            return None
+        return saved['states']
+
+    def save_state(self):
+        if not self.state_path or self.feed is None:
+            return
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        tmp = self.state_path + '.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump({'version': STATE_VERSION, 'trading_date': datetime.now(IST).date(), 'states': self.feed.states}, f)
+        os.replace(tmp, self.state_path)
+
+    def start_session(self, day):
+        """
+        Re-seed every symbol from history at the first cycle of a new session,
+        replacing the previous session's streamed bar with its official close.
+        Symbols whose history cannot be fetched keep their streamed state.
+        """
+        symbols = [state.symbol for state in self.feed.states.values()]
+        self.feed.states.update(self.trader.create_stream(symbols).states)
+        self.session_date = day
+        print(f"New session {day}: re-seeded {len(symbols)} symbols from history")
+
+    # ------------------------------------------------------------------ cycle
+
+    def run_cycle(self):
+        """Refresh every symbol from one batched quotes snapshot and re-evaluate it"""
+        started = time.perf_counter()
+        today = datetime.now(IST).date()
+        if today != self.session_date:
+            self.start_session(today)
+        # Entries about to expire are refreshed in parallel here, not one by one in the loop below
+        self.trader.prefetch_fundamentals(self.watchlist, self.fundamentals_margin)
+        quotes = self.trader.get_quotes(self.watchlist)
+        self.feed.on_message(quotes)
+
+        results = []
+        for state in self.feed.states.values():
+            try:
+                results.append(self.trader.evaluate_trade(
+                    state.symbol, print_stats=False,
+                    fundamentals=self.trader.get_fundamentals(state.symbol),
+                    technicals=state.technicals()
+                ))
+            except Exception as e:
+                print(f"Daemon error for {state.symbol}: {str(e)}")
+                results.append({'ticker': state.symbol, 'decision': 'ERROR', 'reason': str(e)})
+        if self.trader.journal:
+            self.trader.journal.record(results)
+
+        elapsed = time.perf_counter() - started
+        self.cycles += 1
+        metrics.observe('daemon_cycle_seconds', elapsed)
+        buys = [r['ticker'] for r in results if r.get('decision') == 'BUY']
+        print(f"[{datetime.now(IST):%H:%M:%S}] cycle {self.cycles}: {len(quotes)} quotes, "
+              f"{len(buys)} BUY {buys if buys else ''} in {elapsed:.2f}s")
+        return results
+
+    # ------------------------------------------------------------------ loop
+
+    def _acquire_lock(self):
+        os.makedirs(os.path.dirname(self.lock_path) or '.', exist_ok=True)
+        # 'a' so a daemon that fails to get the lock leaves the holder's PID intact
+        self.lock_file = open(self.lock_path, 'a')
+        try:
+            fcntl.flock(self.lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self.lock_file.close()
+            self.lock_file = None
+            return False
+        self.lock_file.truncate(0)
+        self.lock_file.write(str(os.getpid()))
+        self.lock_file.flush()
+        return True
+
+    def missed_closes(self, due, now):
+        """Bar closes after the cycle scheduled for `due` that had passed by `now`; they are skipped, not queued"""
+        missed = 0
+        t = self.calendar.next_bar_close(due, self.interval_minutes)
+        while t + timedelta(seconds=self.close_delay) < now:
+            missed += 1
+            t = self.calendar.next_bar_close(t, self.interval_minutes)
+        return missed
+
+    def _check_holidays(self, day):
+        if day.year not in self.checked_years and not self.calendar.covers(day.year):
+            print(f"Warning: no market_holidays configured for {day.year}; NSE holidays will be scanned as trading days")
+        self.checked_years.add(day.year)
+
+    def stop(self, *args):
+        self.stop_event.set()
+
+    def run(self):
+        if not self._acquire_lock():
+            print(f"Another daemon holds {self.lock_path}; exiting")
+            return
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, self.stop)
+        try:
+            self.warm_up()
+            while not self.stop_event.is_set():
+                now = datetime.now(IST)
+                due = self.calendar.next_bar_close(now, self.interval_minutes) + timedelta(seconds=self.close_delay)
+                self._check_holidays(due.date())
+                if not self.calendar.is_open(now):
+                    print(f"Market closed; next scan at {due:%Y-%m-%d %H:%M:%S}")
+                if self.stop_event.wait((due - now).total_seconds()):
+                    break
+                try:
+                    self.run_cycle()
+                except Exception as e:
+                    metrics.inc('errors_total', method='daemon_cycle')
+                    print(f"Daemon cycle failed: {str(e)}")
+                missed = self.missed_closes(due, datetime.now(IST))
+                if missed:
+                    self.skipped += missed
+                    metrics.inc('daemon_cycles_skipped_total', missed)
+                    print(f"Cycle overran; skipped {missed} bar close(s)")
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        """Persist state and flush every background writer"""
+        print("Shutting down: saving state")
+        self.save_state()
+        trader = self.trader
+        trader.flush_caches()
+        if trader.journal:
+            trader.journal.close()
+        if trader.alerts:
+            trader.alerts.close()
+        if self.lock_file:
+            self.lock_file.close()
+            self.lock_file = None
+
+
+def main():
+    from sampletest import SwingTraderPro
+
+    watchlist = sys.argv[1:] or list(SYMBOL_TO_ISIN)
+    trader = SwingTraderPro(client_id, access_token, connection_check='background')
+    ScanDaemon(trader, watchlist).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import json
+import os
+import threading
+import time
+
+
+class FundamentalsCache:
+    """
+    Disk-backed cache of yfinance `info` fields with a TTL per field.
+
+    An entry needs a refetch as soon as any field expires, but put() only
+    replaces the expired fields, so a long-lived field such as `sector`
+    keeps its value until its own TTL runs out. Entries survive restarts
+    through a JSON file. Writes are batched and
+    flushed at most every `save_interval` seconds, or explicitly via flush().
+    """
+
+    def __init__(self, path, ttls, save_interval=5.0):
+        self.path = path
+        self.ttls = ttls
+        self.save_interval = save_interval
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.last_save = time.time()
+        self.entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, ticker, margin=0):
+        """
+        Return the cached fields for `ticker`, or None if any field is missing
+        or expired (or expires within `margin` seconds)
+        """
+        entry = self.entries.get(ticker)
+        if not entry:
+            return None
+        now = time.time()
+        info = {}
+        for field, ttl in self.ttls.items():
+            if field not in entry:
+                return None
+            value, fetched_at = entry[field]
+            if now - fetched_at > ttl - margin:
+                return None
+            info[field] = value
+        return info
+
+    def is_fresh(self, ticker, margin=0):
+        return self.get(ticker, margin) is not None
+
+    def put(self, ticker, info, margin=0):
+        """
+        Refresh the expired or missing TTL-tracked fields (and those expiring
+        within `margin` seconds) from a yfinance info dict and return the
+        cached field values
+        """
+        now = time.time()
+        with self.lock:
+            entry = dict(self.entries.get(ticker) or {})
+            for field, ttl in self.ttls.items():
+                if field not in entry or now - entry[field][1] > ttl - margin:
+                    entry[field] = [info.get(field), now]
+            self.entries[ticker] = entry
+            self.dirty = True
+            if now - self.last_save >= self.save_interval:
+                self._save()
+        return {field: entry[field][0] for field in self.ttls}
+
+    def flush(self):
+        """Write pending entries to disk"""
+        with self.lock:
+            if self.dirty:
+                self._save()
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+        self.last_save = time.time()
@@ -0,0 +1,250 @@
+import time
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+EMA_SPANS = (9, 21, 50)
+ADX_PERIOD = 14
+VOLUME_PERIOD = 20
+EWM_PANDAS_MAX_ROWS = 64  # Below this many symbols ema() hands the recurrence to pandas
+
+
+def ema(values, span):
+    """Exponential moving average along the bar axis (matches pandas ewm(span, adjust=True))"""
+    values = np.asarray(values, dtype=np.float64)
+    flat = values.reshape(-1, values.shape[-1])
+    if flat.shape[0] < EWM_PANDAS_MAX_ROWS:
+        # Few symbols: pandas' compiled recurrence beats a Python loop over bars
+        return pd.DataFrame(flat.T).ewm(span=span).mean().to_numpy().T.reshape(values.shape)
+
+    decay = 1.0 - 2.0 / (span + 1.0)
+    out = np.empty_like(values)
+    num = np.zeros(values.shape[:-1])
+    den = np.zeros(values.shape[:-1])
+
+    # Recurse over bars, vectorized over symbols
+    for i in range(values.shape[-1]):
+        col = values[..., i]
+        valid = ~np.isnan(col)
+        num = num * decay
+        den = den * decay
+        num[valid] += col[valid]
+        den[valid] += 1.0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out[..., i] = num / den
+    return out
+
+
+def rolling_mean(values, window):
+    """Trailing rolling mean along the bar axis (NaN until `window` valid bars)"""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] >= window:
+        out[..., window - 1:] = sliding_window_view(values, window, axis=-1).mean(axis=-1)
+    return out
+
+
+def _shift(values):
+    """Shift one bar forward along the bar axis, NaN-filling the first bar"""
+    out = np.empty_like(values)
+    out[..., 0] = np.nan
+    out[..., 1:] = values[..., :-1]
+    return out
+
+
+def true_range(high, low, close):
+    """True Range per bar; the first bar falls back to high - low"""
+    prev_close = _shift(close)
+    with np.errstate(invalid='ignore'):
+        return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def directional_movement(high, low):
+    """+DM / -DM per bar using the same tie-breaking as get_technicals"""
+    up = high - _shift(high)
+    down = _shift(low) - low
+    with np.errstate(invalid='ignore'):
+        plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+        minus_dm = np.where((down > plus_dm) & (down > 0), down, 0.0)
+    return plus_dm, minus_dm
+
+
+def compute_indicators(high, low, close, volume, ema_spans=EMA_SPANS, period=ADX_PERIOD, volume_period=VOLUME_PERIOD):
+    """
+    Compute EMA/TR/ATR/DI/DX/ADX/RVOL for a whole panel in one pass.
+
+    Inputs are 2D arrays shaped (symbols, bars), oldest bar first. Shorter
+    histories are left-padded with NaN. Returns a dict of arrays of the same shape.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+
+    result = {f'{span}_ema': ema(close, span) for span in ema_spans}
+
+    tr = true_range(high, low, close)
+    atr = rolling_mean(tr, period)
+    plus_dm, minus_dm = directional_movement(high, low)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        plus_di = 100 * (rolling_mean(plus_dm, period) / atr)
+        minus_di = 100 * (rolling_mean(minus_dm, period) / atr)
+        dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+        vol_avg = rolling_mean(volume, volume_period)
+        rvol = volume / vol_avg
+
+    result.update({
+        'tr': tr,
+        'atr': atr,
+        'plus_dm': plus_dm,
+        'minus_dm': minus_dm,
+        'plus_di': plus_di,
+        'minus_di': minus_di,
+        'dx': dx,
+        'adx': rolling_mean(dx, period),
+        f'{volume_period}_day_vol': vol_avg,
+        'rvol': rvol,
+    })
+    return result
+
+
+def build_panel(frames, columns=('open', 'high', 'low', 'close', 'volume')):
+    """
+    Stack per-symbol OHLC DataFrames into right-aligned (symbols, bars) arrays.
+
+    Returns (symbols, {column: 2D array}); missing leading bars are NaN.
+    """
+    symbols = [s for s, df in frames.items() if df is not None and not df.empty]
+    n_bars = max((len(frames[s]) for s in symbols), default=0)
+    panel = {}
+    for col in columns:
+        arr = np.full((len(symbols), n_bars), np.nan)
+        for row, symbol in enumerate(symbols):
+            values = frames[symbol][col].to_numpy(dtype=np.float64)
+            arr[row, n_bars - len(values):] = values
+        panel[col] = arr
+    return symbols, panel
+
+
+def technicals_frame(df):
+    """Add the get_technicals indicator columns to a single-symbol OHLC DataFrame"""
+    indicators = compute_indicators(
+        df['high'].to_numpy(dtype=np.float64)[None, :],
+        df['low'].to_numpy(dtype=np.float64)[None, :],
+        df['close'].to_numpy(dtype=np.float64)[None, :],
+        df['volume'].to_numpy(dtype=np.float64)[None, :],
+    )
+    for name, values in indicators.items():
+        df[name] = values[0]
+    return df
+
+
+def latest_technicals(symbols, indicators, close):
+    """Build get_technicals-style summaries from the last bar of each panel row"""
+    summaries = {}
+    for row, symbol in enumerate(symbols):
+        ema9 = indicators['9_ema'][row, -1]
+        ema21 = indicators['21_ema'][row, -1]
+        ema50 = indicators['50_ema'][row, -1]
+        summaries[symbol] = {
+            'adx': indicators['adx'][row, -1],
+            'plus_di': indicators['plus_di'][row, -1],
+            'minus_di': indicators['minus_di'][row, -1],
+            'ema_crossover': ema9 > ema21 > ema50,
+            'price_above_ema': close[row, -1] > ema9,
+            'rvol': indicators['rvol'][row, -1],
+            'atr': indicators['atr'][row, -1],
+            'current_price': close[row, -1]
+        }
+    return summaries
+
+
+def reference_technicals(df):
+    """Original row-wise pandas implementation, kept for parity checks and benchmarks"""
+    df = df.copy()
+    df['9_ema'] = df['close'].ewm(span=9).mean()
+    df['21_ema'] = df['close'].ewm(span=21).mean()
+    df['50_ema'] = df['close'].ewm(span=50).mean()
+
+    tr1 = df['high'] - df['low']
+    tr2 = abs(df['high'] - df['close'].shift())
+    tr3 = abs(df['low'] - df['close'].shift())
+    df['tr'] = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+    df['atr'] = df['tr'].rolling(14).mean()
+    df['plus_dm'] = df['high'].diff()
+    df['minus_dm'] = -df['low'].diff()
+    df['plus_dm'] = df.apply(lambda x: x['plus_dm'] if x['plus_dm'] > x['minus_dm'] and x['plus_dm'] > 0 else 0, axis=1)
+    df['minus_dm'] = df.apply(lambda x: x['minus_dm'] if x['minus_dm'] > x['plus_dm'] and x['minus_dm'] > 0 else 0, axis=1)
+    df['plus_di'] = 100 * (df['plus_dm'].rolling(14).mean() / df['atr'])
+    df['minus_di'] = 100 * (df['minus_dm'].rolling(14).mean() / df['atr'])
+    df['dx'] = 100 * abs(df['plus_di'] - df['minus_di']) / (df['plus_di'] + df['minus_di'])
+    df['adx'] = df['dx'].rolling(14).mean()
+
+    df['20_day_vol'] = df['volume'].rolling(20).mean()
+    df['rvol'] = df['volume'] / df['20_day_vol']
+    return df
+
+
+def synthetic_frames(n_symbols, n_bars, seed=0):
+    """Random-walk OHLCV frames for benchmarks"""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(end='2024-01-01', periods=n_bars, freq='B', tz='Asia/Kolkata')
+    frames = {}
+    for i in range(n_symbols):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars)))
+        spread = close * rng.uniform(0.002, 0.03, n_bars)
+        frames[f'SYM{i}'] = pd.DataFrame({
+            'open': close + rng.normal(0, 0.5, n_bars) * spread,
+            'high': close + spread,
+            'low': close - spread,
+            'close': close,
+            'volume': rng.integers(10_000, 1_000_000, n_bars).astype(np.float64),
+            'oi': 0.0,
+        }, index=index)
+    return frames
+
+
+def benchmark(n_symbols=200, n_bars=100):
+    """Compare the vectorized panel engine against the per-symbol df.apply path"""
+    frames = synthetic_frames(n_symbols, n_bars)
+
+    start = time.perf_counter()
+    reference = {s: reference_technicals(df) for s, df in frames.items()}
+    apply_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    symbols, panel = build_panel(frames)
+    indicators = compute_indicators(panel['high'], panel['low'], panel['close'], panel['volume'])
+    panel_time = time.perf_counter() - start
+
+    # Parity check against the original implementation
+    for row, symbol in enumerate(symbols):
+        for name, values in indicators.items():
+            expected = reference[symbol][name].to_numpy(dtype=np.float64)
+            if not np.allclose(values[row], expected, rtol=1e-9, atol=1e-9, equal_nan=True):
+                raise AssertionError(f"{symbol} {name} mismatch")
+
+    print(f"{n_symbols} symbols x {n_bars} bars")
+    print(f"- df.apply path: {apply_time:.3f}s")
+    print(f"- Panel engine:  {panel_time:.3f}s ({apply_time / panel_time:.1f}x faster)")
+
+    # get_technicals path: one symbol at a time through technicals_frame
+    for bars in (250, 2000):
+        df = synthetic_frames(1, bars)['SYM0']
+        start = time.perf_counter()
+        expected = reference_technicals(df)
+        single_apply = time.perf_counter() - start
+        start = time.perf_counter()
+        got = technicals_frame(df.copy())
+        single_frame = time.perf_counter() - start
+        if not np.allclose(got['adx'], expected['adx'], equal_nan=True) or \
+                not np.allclose(got['50_ema'], expected['50_ema'], equal_nan=True):
+            raise AssertionError(f"single symbol x {bars} bars mismatch")
+        print(f"1 symbol x {bars} bars: df.apply {single_apply * 1000:.1f} ms, "
+              f"technicals_frame {single_frame * 1000:.1f} ms")
+    return apply_time, panel_time
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,252 @@
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import zlib
+import numpy as np
+from config import instrument_index_dir, instrument_master_url
+
+RECORD_DTYPE = np.dtype([
+    ('instrument_key', 'S48'),
+    ('segment', 'S12'),
+    ('symbol', 'S48'),
+    ('isin', 'S12'),
+    ('name', 'S64'),
+    ('instrument_type', 'S12'),
+    ('expiry', 'S10'),
+    ('strike', '<f8'),
+    ('lot_size', '<i4'),
+    ('tick_size', '<f8'),
+])
+EMPTY = -1
+
+
+def _hash(value):
+    return zlib.crc32(value)
+
+
+def _encode(value, width):
+    return (value or '').strip().upper().encode('utf-8')[:width]
+
+
+def _read_master(path):
+    """Yield normalised rows from an Upstox instrument master (CSV or JSON, optionally gzipped)"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rb') as raw:
+        if '.json' in path:
+            rows = json.load(raw)
+            for row in rows:
+                yield {
+                    'instrument_key': row.get('instrument_key'),
+                    'segment': row.get('segment'),
+                    'symbol': row.get('trading_symbol') or row.get('tradingsymbol'),
+                    'isin': row.get('isin'),
+                    'name': row.get('name'),
+                    'instrument_type': row.get('instrument_type'),
+                    'expiry': row.get('expiry'),
+                    'strike': row.get('strike_price') or row.get('strike'),
+                    'lot_size': row.get('lot_size'),
+                    'tick_size': row.get('tick_size'),
+                }
+        else:
+            for row in csv.DictReader(io.TextIOWrapper(raw, encoding='utf-8')):
+                yield {
+                    'instrument_key': row.get('instrument_key'),
+                    'segment': row.get('exchange'),
+                    'symbol': row.get('tradingsymbol'),
+                    'isin': row.get('isin'),
+                    'name': row.get('name'),
+                    'instrument_type': row.get('instrument_type'),
+                    'expiry': row.get('expiry'),
+                    'strike': row.get('strike'),
+                    'lot_size': row.get('lot_size'),
+                    'tick_size': row.get('tick_size'),
+                }
+
+
+def _number(value, cast):
+    try:
+        return cast(float(value))
+    except (TypeError, ValueError):
+        return cast(0)
+
+
+def _build_table(keys):
+    """Open-addressing hash table of row numbers (linear probing, load factor <= 0.5)"""
+    size = 1
+    while size < 2 * max(len(keys), 1):
+        size *= 2
+    table = np.full(size, EMPTY, dtype=np.int32)
+    mask = size - 1
+    for row, key in enumerate(keys):
+        if key is None:
+            continue
+        slot = _hash(key) & mask
+        while table[slot] != EMPTY:
+            slot = (slot + 1) & mask
+        table[slot] = row
+    return table
+
+
+def build_index(master_path, index_dir):
+    """Convert an instrument master file into the memory-mappable index in `index_dir`"""
+    rows = []
+    for row in _read_master(master_path):
+        key = (row['instrument_key'] or '').strip()
+        if not key:
+            continue
+        isin = row['isin']
+        if not isin and '|' in key and key.split('|', 1)[1].startswith('IN'):
+            # Equity instrument keys carry the ISIN, e.g. NSE_EQ|INE002A01018
+            isin = key.split('|', 1)[1]
+        expiry = row['expiry']
+        if isinstance(expiry, (int, float)):
+            expiry = np.datetime_as_string(np.datetime64(int(expiry), 'ms'), unit='D')
+        rows.append((
+            key.encode('utf-8')[:48],
+            _encode(row['segment'], 12),
+            _encode(row['symbol'], 48),
+            _encode(isin, 12),
+            (row['name'] or '').strip().encode('utf-8')[:64],
+            _encode(row['instrument_type'], 12),
+            _encode(str(expiry or ''), 10),
+            _number(row['strike'], float),
+            _number(row['lot_size'], int),
+            _number(row['tick_size'], float),
+        ))
+    records = np.array(rows, dtype=RECORD_DTYPE)
+
+    os.makedirs(index_dir, exist_ok=True)
+    np.save(os.path.join(index_dir, 'records.npy'), records)
+    np.save(os.path.join(index_dir, 'key_table.npy'), _build_table(list(records['instrument_key'])))
+    np.save(os.path.join(index_dir, 'symbol_table.npy'), _build_table(
+        [seg + b':' + sym for seg, sym in zip(records['segment'], records['symbol'])]
+    ))
+    np.save(os.path.join(index_dir, 'isin_table.npy'), _build_table(
+        [seg + b':' + isin if isin else None for seg, isin in zip(records['segment'], records['isin'])]
+    ))
+
+    # Symbols in sorted order for prefix search
+    order = np.argsort(records['symbol'], kind='stable').astype(np.int32)
+    np.save(os.path.join(index_dir, 'sorted_rows.npy'), order)
+    np.save(os.path.join(index_dir, 'sorted_symbols.npy'), records['symbol'][order])
+    return len(records)
+
+
+class InstrumentIndex:
+    """
+    Read-only instrument master index opened with np.load(mmap_mode='r').
+
+    Nothing is parsed at startup: lookups probe memory-mapped hash tables and
+    only touch the pages they need, so startup time and resident memory stay
+    flat however large the master file is.
+    """
+
+    def __init__(self, index_dir):
+        def load(name):
+            return np.load(os.path.join(index_dir, f'{name}.npy'), mmap_mode='r')
+        self.records = load('records')
+        self.key_table = load('key_table')
+        self.symbol_table = load('symbol_table')
+        self.isin_table = load('isin_table')
+        self.sorted_rows = load('sorted_rows')
+        self.sorted_symbols = load('sorted_symbols')
+
+    @staticmethod
+    def exists(index_dir):
+        return os.path.exists(os.path.join(index_dir, 'records.npy'))
+
+    def __len__(self):
+        return len(self.records)
+
+    def _probe(self, table, key, matches):
+        mask = len(table) - 1
+        slot = _hash(key) & mask
+        while True:
+            row = int(table[slot])
+            if row == EMPTY:
+                return None
+            if matches(self.records[row]):
+                return row
+            slot = (slot + 1) & mask
+
+    def _details(self, row):
+        if row is None:
+            return None
+        rec = self.records[row]
+        segment = rec['segment'].decode()
+        return {
+            'symbol': rec['symbol'].decode(),
+            'isin': rec['isin'].decode() or None,
+            'instrument_key': rec['instrument_key'].decode(),
+            'exchange': segment.split('_')[0],
+            'segment': segment,
+            'name': rec['name'].decode('utf-8', 'ignore'),
+            'instrument_type': rec['instrument_type'].decode(),
+            'expiry': rec['expiry'].decode() or None,
+            'strike': float(rec['strike']),
+            'lot_size': int(rec['lot_size']),
+            'tick_size': float(rec['tick_size']),
+        }
+
+    def by_key(self, instrument_key):
+        key = instrument_key.encode('utf-8')
+        return self._details(self._probe(self.key_table, key, lambda r: r['instrument_key'] == key))
+
+    def by_symbol(self, symbol, segment='NSE_EQ'):
+        seg, sym = _encode(segment, 12), _encode(symbol, 48)
+        return self._details(self._probe(
+            self.symbol_table, seg + b':' + sym, lambda r: r['segment'] == seg and r['symbol'] == sym
+        ))
+
+    def by_isin(self, isin, segment='NSE_EQ'):
+        seg, code = _encode(segment, 12), _encode(isin, 12)
+        return self._details(self._probe(
+            self.isin_table, seg + b':' + code, lambda r: r['segment'] == seg and r['isin'] == code
+        ))
+
+    def symbols(self, segment='NSE_EQ', instrument_type='EQUITY'):
+        """Trading symbols of every instrument in a segment, e.g. the whole NSE cash market"""
+        mask = self.records['segment'] == _encode(segment, 12)
+        if instrument_type:
+            mask &= self.records['instrument_type'] == _encode(instrument_type, 12)
+        return [symbol.decode() for symbol in self.records['symbol'][mask]]
+
+    def search(self, prefix, segment=None, limit=20):
+        """Instruments whose trading symbol starts with `prefix` (binary search on the sorted column)"""
+        lo_key = _encode(prefix, 48)
+        lo = int(np.searchsorted(self.sorted_symbols, lo_key, side='left'))
+        results = []
+        seg = _encode(segment, 12) if segment else None
+        for pos in range(lo, len(self.sorted_symbols)):
+            if not self.sorted_symbols[pos].startswith(lo_key):
+                break
+            row = int(self.sorted_rows[pos])
+            if seg is None or self.records[row]['segment'] == seg:
+                results.append(self._details(row))
+                if len(results) >= limit:
+                    break
+        return results
+
+
+def download_master(path, url=instrument_master_url):
+    """Download the Upstox instrument master file to `path`"""
+    import requests
+    with requests.get(url, stream=True, timeout=60) as response:
+        response.raise_for_status()
+        with open(path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=1 << 20):
+                f.write(chunk)
+    return path
+
+
+if __name__ == "__main__":
+    # python instruments.py [master file] -- downloads the master file when none is given
+    master_path = sys.argv[1] if len(sys.argv) > 1 else None
+    if master_path is None:
+        os.makedirs(os.path.dirname(instrument_index_dir), exist_ok=True)
+        master_path = download_master(os.path.join(os.path.dirname(instrument_index_dir), 'complete.csv.gz'))
+    count = build_index(master_path, instrument_index_dir)
+    print(f"Indexed {count} instruments")
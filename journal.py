@@ -0,0 +1,208 @@
+import os
+import queue
+import threading
+import time
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+
+from config import journal_dir
+
+# One file per column per date partition: <root>/<YYYY-MM-DD>/<column>.bin
+COLUMNS = {
+    'ts': '<i8',  # ns since epoch (UTC)
+    'ticker': 'S24',
+    'decision': 'S8',
+    'reason': 'S48',
+    'entry': '<f8',
+    'stop_loss': '<f8',
+    'target': '<f8',
+    'adx': '<f4',
+    'rvol': '<f4',
+    'atr': '<f4',
+    'risk_reward': '<f4',
+}
+TEXT_COLUMNS = {name for name, dtype in COLUMNS.items() if dtype.startswith('S')}
+MARKET_TZ = 'Asia/Kolkata'
+IST_OFFSET = 19800 * 1_000_000_000
+DAY = 86400 * 1_000_000_000
+
+
+def _encode(value, size):
+    """UTF-8 bytes of `value` cut to `size` on a character boundary"""
+    return str(value or '').encode('utf-8')[:size].decode('utf-8', 'ignore').encode('utf-8')
+
+
+def _blank(name, rows):
+    """`rows` missing values for a column: NaN for floats, empty strings / zero otherwise"""
+    dtype = np.dtype(COLUMNS[name])
+    return np.full(rows, np.nan, dtype=dtype) if dtype.kind == 'f' else np.zeros(rows, dtype=dtype)
+
+
+def to_columns(decisions, timestamp_ns):
+    """evaluate_trade result dicts -> typed column arrays (missing fields become NaN / empty)"""
+    columns = {}
+    for name, dtype in COLUMNS.items():
+        if name == 'ts':
+            values = [timestamp_ns] * len(decisions)
+        elif name in TEXT_COLUMNS:
+            values = [_encode(d.get(name), np.dtype(dtype).itemsize) for d in decisions]
+        else:
+            values = [d.get(name, np.nan) for d in decisions]
+        columns[name] = np.array(values, dtype=dtype)
+    return columns
+
+
+class ScanJournal:
+    """
+    Append-only columnar journal of scan decisions, partitioned by IST date.
+
+    record() only enqueues; a writer thread appends each column's raw values
+    to its own file, so queries read just the columns and dates they need.
+    A partially written batch (e.g. after a crash) is ignored on read by
+    taking the shortest existing column as the row count, and only the rows
+    past it are cut off before the next append so later rows stay aligned.
+    A column file that is missing altogether reads as NaN / empty values and
+    is back-filled with them on the next append.
+    """
+
+    def __init__(self, root=journal_dir, maxsize=10_000):
+        self.root = root
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.written = 0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def record(self, decisions, timestamp=None):
+        """Queue one scan's decisions without blocking; returns False if the queue is full"""
+        decisions = [d for d in decisions if d]
+        if not decisions:
+            return True
+        ts = pd.Timestamp(timestamp).value if timestamp is not None else time.time_ns()
+        try:
+            self.queue.put_nowait((ts, decisions))
+        except queue.Full:
+            self.dropped += len(decisions)
+            return False
+        return True
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch = []
+            item = self.queue.get()
+            while True:
+                if item is None:
+                    stop = True
+                    self.queue.task_done()
+                    break
+                batch.append(item)
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            if not batch:
+                continue
+            try:
+                self._append(batch)
+            except Exception as e:
+                print(f"Journal write error: {str(e)}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def _append(self, batch):
+        parts = [to_columns(decisions, ts) for ts, decisions in batch]
+        columns = {name: np.concatenate([p[name] for p in parts]) for name in COLUMNS}
+        days = (columns['ts'] + IST_OFFSET) // DAY
+        for day in np.unique(days):
+            rows = days == day
+            partition = os.path.join(self.root, str(date(1970, 1, 1) + timedelta(days=int(day))))
+            os.makedirs(partition, exist_ok=True)
+            committed = self._row_count(partition)
+            for name, values in columns.items():
+                itemsize = np.dtype(COLUMNS[name]).itemsize
+                with open(os.path.join(partition, f'{name}.bin'), 'ab') as f:
+                    present = os.fstat(f.fileno()).st_size // itemsize
+                    f.truncate(min(present, committed) * itemsize)
+                    f.seek(0, os.SEEK_END)
+                    if present < committed:
+                        _blank(name, committed - present).tofile(f)
+                    values[rows].tofile(f)
+        self.written += len(columns['ts'])
+
+    def flush(self):
+        """Block until everything queued so far is on disk"""
+        self.queue.join()
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+    def partitions(self, start=None, end=None):
+        """Partition dates present on disk within [start, end]"""
+        if not os.path.isdir(self.root):
+            return []
+        start = pd.Timestamp(start).date() if start is not None else None
+        end = pd.Timestamp(end).date() if end is not None else None
+        days = []
+        for name in sorted(os.listdir(self.root)):
+            try:
+                day = date.fromisoformat(name)
+            except ValueError:
+                continue
+            if (start is None or day >= start) and (end is None or day <= end):
+                days.append(day)
+        return days
+
+    @staticmethod
+    def _row_count(partition):
+        """Rows present in every existing column of a partition (a torn batch only counts where complete)"""
+        rows = []
+        for name, dtype in COLUMNS.items():
+            path = os.path.join(partition, f'{name}.bin')
+            if os.path.exists(path):
+                rows.append(os.path.getsize(path) // np.dtype(dtype).itemsize)
+        return min(rows, default=0)
+
+    def _read_partition(self, day, names):
+        partition = os.path.join(self.root, str(day))
+        rows = self._row_count(partition)
+        data = {}
+        for name in names:
+            path = os.path.join(partition, f'{name}.bin')
+            data[name] = np.fromfile(path, dtype=COLUMNS[name], count=rows) if os.path.exists(path) else _blank(name, rows)
+        return data
+
+    def query(self, columns=None, start=None, end=None, ticker=None, decision=None):
+        """
+        Journal rows as a DataFrame, reading only `columns` (plus any filter
+        columns) from the date partitions in [start, end]. Examples:
+
+            journal.query(['ts', 'entry', 'target'], start=date.today() - timedelta(days=30),
+                          ticker='RELIANCE', decision='BUY')
+            journal.query(['adx'], decision='HOLD')['adx'].describe()
+        """
+        columns = list(columns or COLUMNS)
+        filters = {'ticker': ticker, 'decision': decision}
+        names = set(columns) | {name for name, value in filters.items() if value is not None}
+
+        chunks = []
+        for day in self.partitions(start, end):
+            data = self._read_partition(day, names)
+            mask = np.ones(len(next(iter(data.values()))), dtype=bool)
+            for name, value in filters.items():
+                if value is not None:
+                    mask &= np.isin(data[name], [v.encode() for v in np.atleast_1d(value)])
+            chunks.append({name: data[name][mask] for name in columns})
+
+        if not chunks:
+            return pd.DataFrame({name: np.empty(0, dtype=COLUMNS[name]) for name in columns})
+        merged = {name: np.concatenate([c[name] for c in chunks]) for name in columns}
+        for name in TEXT_COLUMNS & set(columns):
+            merged[name] = np.char.decode(merged[name], 'utf-8')
+        df = pd.DataFrame(merged)
+        if 'ts' in df:
+            df['ts'] = pd.to_datetime(df['ts'], unit='ns', utc=True).dt.tz_convert(MARKET_TZ)
+        return df
@@ -0,0 +1,219 @@
+import functools
+import json
+import sys
+import threading
+import time
+import weakref
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import metrics_enabled
+
+PREFIX = 'swingtrader'
+
+
+class Metrics:
+    """
+    In-process counters and call timers with Prometheus-text and JSON export.
+
+    Every recording call returns immediately while `enabled` is False, so the
+    instrumentation can stay in the hot path at near-zero cost.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.timers = defaultdict(lambda: [0, 0.0, 0.0])  # count, total, max
+        self.collectors = []
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def inc(self, name, value=1, **labels):
+        """Add `value` to a labelled counter"""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] += value
+
+    def observe(self, name, seconds, **labels):
+        """Record one timed call"""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            timer = self.timers[key]
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+
+    def add_collector(self, collect):
+        """
+        Register a callable returning [(name, labels, value)] gauges, evaluated
+        only at export. Bound methods are held weakly so owners can be collected.
+        """
+        if hasattr(collect, '__self__'):
+            self.collectors.append(weakref.WeakMethod(collect))
+        else:
+            self.collectors.append(lambda: collect)
+
+    def timed(self, method):
+        """Decorator timing calls as call_seconds{method=...} and counting exceptions"""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                except Exception:
+                    self.inc('exceptions_total', method=method)
+                    raise
+                finally:
+                    self.observe('call_seconds', time.perf_counter() - start, method=method)
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        """Current values as plain dicts"""
+        with self.lock:
+            counters = [(name, dict(labels), value) for (name, labels), value in self.counters.items()]
+            timers = [(name, dict(labels), list(t)) for (name, labels), t in self.timers.items()]
+        gauges = []
+        for ref in list(self.collectors):
+            collect = ref()
+            if collect is None:
+                self.collectors.remove(ref)
+                continue
+            gauges.extend((name, dict(labels), value) for name, labels, value in collect())
+        return {
+            'counters': [{'name': n, 'labels': l, 'value': v} for n, l, v in counters],
+            'timers': [{'name': n, 'labels': l, 'count': t[0], 'sum': t[1], 'max': t[2]} for n, l, t in timers],
+            'gauges': [{'name': n, 'labels': l, 'value': v} for n, l, v in gauges],
+        }
+
+    def to_json(self):
+        return json.dumps(self.snapshot())
+
+    def to_prometheus(self):
+        """Prometheus text exposition format (one block per metric family)"""
+        snap = self.snapshot()
+        families = {}
+
+        def add(name, kind, line):
+            families.setdefault(name, (kind, []))[1].append(line)
+
+        for item in snap['counters']:
+            name = f"{PREFIX}_{item['name']}"
+            add(name, 'counter', f"{name}{_labels(item['labels'])} {item['value']}")
+        for item in snap['timers']:
+            name = f"{PREFIX}_{item['name']}"
+            add(name, 'summary', f"{name}_count{_labels(item['labels'])} {item['count']}")
+            add(name, 'summary', f"{name}_sum{_labels(item['labels'])} {item['sum']}")
+            add(f"{name}_max", 'gauge', f"{name}_max{_labels(item['labels'])} {item['max']}")
+        for item in snap['gauges']:
+            name = f"{PREFIX}_{item['name']}"
+            add(name, 'gauge', f"{name}{_labels(item['labels'])} {item['value']}")
+
+        lines = []
+        for name, (kind, samples) in families.items():
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port, host='127.0.0.1'):
+        """Expose /metrics (Prometheus text) and /metrics.json from a daemon thread"""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith('/metrics.json'):
+                    body, content_type = registry.to_json().encode(), 'application/json'
+                elif self.path.startswith('/metrics'):
+                    body, content_type = registry.to_prometheus().encode(), 'text/plain; version=0.0.4'
+                else:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in sorted(labels.items())) + '}'
+
+
+class SamplingProfiler:
+    """
+    Opt-in statistical profiler: a background thread samples every thread's
+    Python stack at `interval` seconds and aggregates collapsed stacks
+    (flamegraph.pl / speedscope format).
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = Counter()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if self.running:
+            return self
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join()
+        return self
+
+    def _run(self):
+        own = threading.get_ident()
+        while self.running:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.samples[';'.join(reversed(stack))] += 1
+            time.sleep(self.interval)
+
+    def collapsed(self):
+        return '\n'.join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            f.write(self.collapsed() + '\n')
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+metrics = Metrics(enabled=metrics_enabled)
@@ -0,0 +1,50 @@
+import threading
+import time
+from collections import deque
+
+
+class SlidingWindow:
+    """At most `limit` acquisitions in any `per`-second window, tracked as a log of grant times"""
+
+    def __init__(self, limit, per=1.0):
+        self.limit = limit
+        self.per = per
+        self.granted = deque()
+
+    def wait_time(self, now):
+        """Seconds until another acquisition fits in the window"""
+        while self.granted and self.granted[0] <= now - self.per:
+            self.granted.popleft()
+        if len(self.granted) < self.limit:
+            return 0.0
+        return self.granted[0] + self.per - now
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter enforcing several sliding windows at once
+    (e.g. Upstox per-second and per-minute quotas). Unlike a token bucket
+    it never allows more than the quota in any window, including at startup.
+    """
+
+    def __init__(self, limits):
+        # limits: iterable of (requests, seconds) pairs
+        self.windows = [SlidingWindow(count, per) for count, per in limits]
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until every window has room, record one acquisition in each and return its time"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                wait = max((w.wait_time(now) for w in self.windows), default=0.0)
+                if wait <= 0:
+                    for window in self.windows:
+                        window.granted.append(now)
+                    return now
+            time.sleep(wait)
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc):
+        return False
@@ -1,14 +1,32 @@
-import yfinance as yf
 import pandas as pd
-import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+import threading
 import time
-import matplotlib.pyplot as plt
-from config import sector_params, SYMBOL_TO_ISIN, base_url
+from config import sector_params, SYMBOL_TO_ISIN, base_url, rate_limits, scan_workers, candle_store_dir, candle_refresh_seconds
+from config import fundamentals_cache_path, fundamentals_ttl, instrument_index_dir, analysis_cache_size
+from config import metrics_port, profile_output, candle_dtype, candle_max_bars, connection_check
+from config import chart_output_dir, chart_format, mtf_timeframes, mtf_days_back, screen_top_k, quote_batch_size
+from config import journal_dir
+from indicators import technicals_frame
+from ratelimit import RateLimiter
+from candle_store import CandleStore
+from fundamentals_cache import FundamentalsCache
+from streaming import IndicatorState, QuoteFeed, patch_live_bar, quote_date
+from instruments import InstrumentIndex
+from analysis_cache import MemoCache
+from metrics import metrics, SamplingProfiler
+from candle_decoder import decode_response
+from timeframes import MultiTimeframeState, resample, timeframes_aligned
+from alerts import AlertDispatcher, make_transport
+from journal import ScanJournal
 
 class SwingTraderPro:
-    def __init__(self, client_id, access_token):
+    def __init__(self, client_id, access_token, base_url=base_url, max_workers=scan_workers, candle_store_dir=candle_store_dir,
+                 fundamentals_cache_path=fundamentals_cache_path, connection_check=connection_check, alert_transport=None,
+                 journal_dir=journal_dir):
         # Upstox API v2 configuration
         self.base_url = base_url
         self.client_id = client_id
@@ -20,28 +38,64 @@ class SwingTraderPro:
             'Content-Type': 'application/json'
         }
 
+        # Keep-alive connection pool shared by all requests, sized for the scan pool
+        self.max_workers = max_workers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update(self.headers)
+        self.rate_limiter = RateLimiter(rate_limits)
+
+        # Local candle history; pass candle_store_dir=None to always fetch the full window
+        self.candle_store = CandleStore(candle_store_dir, max_bars=candle_max_bars) if candle_store_dir else None
+        self.candle_refresh_seconds = candle_refresh_seconds
+        self.candle_dtype = candle_dtype
+
+        # Candles and indicator frames shared by every analysis method (LRU)
+        self.analysis_cache = MemoCache(analysis_cache_size)
+        metrics.add_collector(self._cache_gauges)
+
+        # BUY alerts go through a background dispatcher so sends never stall a scan
+        transport = alert_transport or make_transport()
+        self.alerts = AlertDispatcher(transport) if transport else None
+
+        # Every scan's decisions are appended to the on-disk journal by a writer thread
+        self.journal = ScanJournal(journal_dir) if journal_dir else None
+
         self.SYMBOL_TO_ISIN = SYMBOL_TO_ISIN
 
     # Reverse mapping for lookup
         self.ISIN_TO_SYMBOL = {v: k for k, v in self.SYMBOL_TO_ISIN.items()}
+
+        # Memory-mapped instrument master index (build with: python instruments.py complete.csv.gz)
+        self.instruments = InstrumentIndex(instrument_index_dir) if InstrumentIndex.exists(instrument_index_dir) else None
             
-        # Verify connection
-        self._verify_connection()
+        # Verify connection: 'eager' blocks here, 'background' overlaps the
+        # /user/profile round trip with the first data fetches
+        self.connection_error = None
+        self.connection_thread = None
+        if connection_check == 'background':
+            self.connection_thread = threading.Thread(target=self._verify_in_background, daemon=True)
+            self.connection_thread.start()
+        else:
+            self._verify_connection()
         
         # Enhanced sector parameters (30+ sectors)
         self.sector_params = sector_params
+        self.sector_index = {k.lower(): v for k, v in sector_params.items()}
+
+        # Fundamentals change at most daily; pass fundamentals_cache_path=None to disable caching
+        self.fundamentals_cache = FundamentalsCache(fundamentals_cache_path, fundamentals_ttl) if fundamentals_cache_path else None
         
+    @metrics.timed('verify_connection')
     def _verify_connection(self):
         """Verify API connection works with proper client_id"""
         try:
             url = f"{self.base_url}/user/profile"
             params = {'client_id': self.client_id}
             
-            response = requests.get(
-                url,
-                headers=self.headers,
-                params=params
-            )
+            response = self._get(url, params=params)
             
             if response.status_code == 200:
                 print("Successfully connected to Upstox API v2")
@@ -52,31 +106,60 @@ class SwingTraderPro:
         except Exception as e:
             raise ConnectionError(f"API connection error: {str(e)}")
 
-    def _get_instrument_details(self, symbol):
+    def _verify_in_background(self):
+        try:
+            self._verify_connection()
+        except ConnectionError as e:
+            print(str(e))
+            self.connection_error = e
+
+    def wait_for_connection(self, timeout=None):
+        """Wait for a background connection check and raise its error, if any"""
+        if self.connection_thread is not None:
+            self.connection_thread.join(timeout)
+        if self.connection_error is not None:
+            raise self.connection_error
+        return True
+
+    def _get(self, url, **kwargs):
+        """Rate-limited GET through the pooled session"""
+        self.rate_limiter.acquire()
+        if not metrics.enabled:
+            return self.session.get(url, **kwargs)
+
+        endpoint = url[len(self.base_url):].split('/')[1]
+        try:
+            response = self.session.get(url, **kwargs)
+        except Exception:
+            metrics.inc('http_errors_total', endpoint=endpoint)
+            raise
+        metrics.inc('http_responses_total', endpoint=endpoint, status=response.status_code)
+        metrics.inc('http_response_bytes_total', len(response.content), endpoint=endpoint)
+        return response
+
+    def _cache_gauges(self):
+        """Analysis cache statistics for the metrics export"""
+        stats = self.analysis_cache.stats()
+        return [
+            ('cache_entries', {'cache': 'analysis'}, stats['size']),
+            ('cache_hits', {'cache': 'analysis'}, stats['hits']),
+            ('cache_misses', {'cache': 'analysis'}, stats['misses']),
+        ]
+
+    def _get_instrument_details(self, symbol, segment='NSE_EQ'):
             try:
+                # Full instrument master index (NSE, BSE, F&O) when it has been built
+                if self.instruments is not None:
+                    details = self.instruments.by_symbol(symbol, segment)
+                    if details:
+                        return details
+
                 isin = self.SYMBOL_TO_ISIN.get(symbol)
                 if not isin:
-                    print(f"ISIN not found for {symbol}. Please add to SYMBOL_TO_ISIN mapping.")
+                    print(f"ISIN not found for {symbol}. Build the instrument index or add it to SYMBOL_TO_ISIN.")
                     return None
 
                 instrument_key = f"NSE_EQ|{isin}"    
-                # url = f"{self.base_url}/search/instruments"
-                # params = {
-                #     'query': isin,
-                #     'exchange': 'NSE',
-                #     'client_id': self.client_id
-                # }
-                
-                # response = requests.get(url, headers=self.headers, params=params)
-                # if response.status_code == 200:
-                #     instruments = response.json()['data']
-                #     if instruments:
-                #         return {
-                #             'symbol': symbol,
-                #             'isin': isin,
-                #             'exchange': instruments[0]['exchange'],
-                #             'instrument_key': instrument_key,
-                #         }
                 return {
                 'symbol': symbol,
                 'isin': isin,
@@ -88,6 +171,7 @@ class SwingTraderPro:
                 print(f"Error getting instrument details: {str(e)}")
                 return None
 
+    @metrics.timed('get_ohlc_data')
     def get_ohlc_data(self, symbol, interval='day', days_back=100):
         """Get OHLC data from Upstox API v2 with proper client_id"""
         try:
@@ -96,114 +180,285 @@ class SwingTraderPro:
                 print(f"Instrument details not found for {symbol}")
                 return None
 
-            # Format dates
-            to_date = datetime.now().strftime('%Y-%m-%d')
-            from_date = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
-            
-            # URL-encode the instrument key (replace | with %7C)
-            encoded_key = instrument['instrument_key'].replace("|", "%7C")
-            
-            url = f"{self.base_url}/historical-candle/{encoded_key}/{interval}/{to_date}/{from_date}"
-            
-            response = requests.get(
-                url,
-                headers=self.headers
+            # Date window for the request
+            to_date = datetime.now().date()
+            from_date = to_date - timedelta(days=days_back)
+            instrument_key = instrument['instrument_key']
+
+            if self.candle_store is None:
+                return self._fetch_candles(symbol, instrument_key, interval, from_date, to_date)
+
+            # Only ask the API for the part of the window the local store is missing
+            ranges = self.candle_store.missing_ranges(
+                instrument_key, interval, from_date, to_date,
+                refresh_seconds=self.candle_refresh_seconds
             )
+            metrics.inc('cache_requests_total', cache='candles', result='miss' if ranges else 'hit')
+            for range_from, range_to in ranges:
+                df = self._fetch_candles(symbol, instrument_key, interval, range_from, range_to)
+                if df is None:
+                    return None
+                self.candle_store.write(instrument_key, interval, df, covered_from=range_from)
 
-            if response.status_code == 200:
-                data = response.json()
-                candles = data['data']['candles']
-                
-                # Create DataFrame
-                df = pd.DataFrame(candles, columns=[
-                    'timestamp',
-                    'open',
-                    'high', 
-                    'low',
-                    'close',
-                    'volume',
-                    'oi'
-                ])
-                
-                # Convert and sort timestamps
-                df['timestamp'] = pd.to_datetime(df['timestamp'])
-                df.set_index('timestamp', inplace=True)
-                df.sort_index(ascending=True, inplace=True)
-                
-                return df
-                
-            else:
-                print(f"OHLC API Error for {symbol}: {response.status_code} - {response.text}")
-                return None
+            return self.candle_store.read(instrument_key, interval, start=from_date)
 
         except Exception as e:
+            metrics.inc('errors_total', method='get_ohlc_data')
             print(f"Error in get_ohlc_data for {symbol}: {str(e)}")
             return None
     
-    def get_fundamentals(self, ticker):
-       max_retries = 2
-       for attempt in range(max_retries):
+    def _fetch_candles(self, symbol, instrument_key, interval, from_date, to_date):
+        """Download one date range from /historical-candle as a DataFrame"""
+        # URL-encode the instrument key (replace | with %7C)
+        encoded_key = instrument_key.replace("|", "%7C")
+        
+        url = f"{self.base_url}/historical-candle/{encoded_key}/{interval}/{to_date:%Y-%m-%d}/{from_date:%Y-%m-%d}"
+        
+        response = self._get(url)
+
+        if response.status_code == 200:
+            # Decode straight into typed columns (newest-first order flipped as a view)
+            return decode_response(response.content, dtype=self.candle_dtype)
+            
+        else:
+            if response.status_code in (401, 403):
+                # Report the connection check failure rather than a bare auth error
+                self.wait_for_connection()
+            print(f"OHLC API Error for {symbol}: {response.status_code} - {response.text}")
+            return None
+    
+    @metrics.timed('get_fundamentals')
+    def get_fundamentals(self, ticker, margin=0):
+        # Serve from the TTL cache when every tracked field stays fresh for `margin` more seconds
+        info = self.fundamentals_cache.get(ticker, margin) if self.fundamentals_cache else None
+        metrics.inc('cache_requests_total', cache='fundamentals', result='miss' if info is None else 'hit')
+        if info is None:
+            info = self._fetch_fundamentals_info(ticker)
+            if info is None:
+                return self._fallback_fundamentals(ticker)
+            if self.fundamentals_cache:
+                # Fields that are still fresh (e.g. sector) keep their cached values
+                info = self.fundamentals_cache.put(ticker, info, margin)
+        info = {k: v for k, v in info.items() if v is not None}
+
+        # Get sector and clean it (remove extra spaces, handle None)
+        sector = (info.get('sector') or 'default').strip().title()
+        
+        # Match sector to our parameters (case-insensitive index)
+        params = self.sector_index.get(sector.lower(), self.sector_params['default'])
+        
+        return {
+            'ticker': ticker,
+            'sector': sector,  # Actual sector from Yahoo
+            'debt_ok': info.get('debtToEquity', 0) < params['debt_equity_max'],
+            'pe_ok': info.get('trailingPE', 100) < params['pe_max'],
+            # 'current_ratio_ok': info.get('currentRatio', 0) > 0.5,
+            # 'quick_ratio_ok': info.get('quickRatio', 0) > 0.4
+        }
+
+    def _fallback_fundamentals(self, ticker):
+        """Fail-closed fundamentals when yfinance has nothing for `ticker`: both gates rejected"""
+        return {
+            'ticker': ticker,
+            'sector': 'Unknown',
+            'debt_ok': False,
+            'pe_ok': False,
+            'unavailable': True,
+        }
+
+    def _fetch_fundamentals_info(self, ticker):
+        """Fetch the yfinance info dict, retrying without the .NS suffix"""
+        max_retries = 2
+        for attempt in range(max_retries):
             try:
+                import yfinance as yf  # Loaded on first fundamentals fetch
+
                 yf_ticker = f"{ticker}.NS" if attempt == 0 else ticker
                 stock = yf.Ticker(yf_ticker)
                 info = stock.info
                 
                 if not info:
                     raise ValueError("Empty response from yfinance")
-                
-                # Get sector and clean it (remove extra spaces, handle None)
-                sector = (info.get('sector') or 'default').strip().title()
-                
-                # Match sector to our parameters (with case-insensitive fallback)
-                params = next(
-                    (v for k, v in self.sector_params.items() 
-                    if k.lower() == sector.lower()),
-                    self.sector_params['default']
-                )
-                
-                return {
-                    'ticker': ticker,
-                    'sector': sector,  # Actual sector from Yahoo
-                    'debt_ok': info.get('debtToEquity', 0) < params['debt_equity_max'],
-                    'pe_ok': info.get('trailingPE', 100) < params['pe_max'],
-                    # 'current_ratio_ok': info.get('currentRatio', 0) > 0.5,
-                    # 'quick_ratio_ok': info.get('quickRatio', 0) > 0.4
-                }
+                return info
                 
             except Exception as e:
                 print(f"Attempt {attempt+1} for {ticker}: {str(e)}")
                 if attempt == max_retries - 1:
-                    return self._fallback_fundamentals(ticker)
+                    metrics.inc('errors_total', method='get_fundamentals')
+                    return None
+                metrics.inc('retries_total', method='get_fundamentals')
                 time.sleep(1)
 
-    def get_technicals(self, ticker):
+    def prefetch_fundamentals(self, watchlist, margin=0):
+        """
+        Warm the fundamentals cache for a whole watchlist in parallel (e.g. before
+        market open); entries expiring within `margin` seconds are refreshed too.
+        Returns the number of symbols fetched.
+        """
+        if not self.fundamentals_cache:
+            return 0
+        stale = [t for t in watchlist if not self.fundamentals_cache.is_fresh(t, margin)]
+        if not stale:
+            return 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            list(pool.map(lambda t: self._fetch_and_cache_fundamentals(t, margin), stale))
+        self.fundamentals_cache.flush()
+        return len(stale)
+
+    def _fetch_and_cache_fundamentals(self, ticker, margin=0):
+        try:
+            self.get_fundamentals(ticker, margin)
+        except Exception as e:
+            print(f"Prefetch error for {ticker}: {str(e)}")
+
+    def get_quotes(self, watchlist):
+        """
+        Full market quotes for many symbols, quote_batch_size instrument keys
+        per /market-quote/quotes request. Returns {ticker: quote}.
+        """
+        keys = {}
+        for ticker in watchlist:
+            instrument = self._get_instrument_details(ticker)
+            if instrument:
+                keys[instrument['instrument_key']] = ticker
+        batches = [list(keys)[i:i + quote_batch_size] for i in range(0, len(keys), quote_batch_size)]
+
+        def fetch(batch):
+            response = self._get(f"{self.base_url}/market-quote/quotes", params={'instrument_key': ','.join(batch)})
+            if response.status_code != 200:
+                print(f"Quote API Error: {response.status_code} - {response.text}")
+                return {}
+            return response.json().get('data', {})
+
+        quotes = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for data in pool.map(fetch, batches):
+                for quote in data.values():
+                    ticker = keys.get(quote.get('instrument_token'))
+                    if ticker:
+                        quotes[ticker] = quote
+        return quotes
+
+    def refresh_live_bars(self, watchlist, days_back=100):
+        """
+        Patch today's partial bar from batched market quotes onto each symbol's
+        cached daily history, so a rescan costs one quotes request per
+        quote_batch_size symbols instead of a history request per symbol.
+        History goes through get_candles (and the candle store) only for symbols
+        with no cached frame or a quote from a newer session, so the previous
+        session's final bar is fetched rather than left as its last intraday
+        snapshot; within a session the cached frame is patched whatever its age.
+        Returns {ticker: patched candles}.
+        """
+        quotes = self.get_quotes(watchlist)
+
+        def patch(ticker):
+            key = ('candles', ticker, 'day', days_back)
+            quote = quotes[ticker]
+            df = self.analysis_cache.peek(key)
+            if df is None or (len(df) and quote_date(quote) > df.index[-1].date()):
+                self.analysis_cache.discard(key)
+                df = self.get_candles(ticker, days_back=days_back)
+            if df is None:
+                return None
+            df = patch_live_bar(df, quote)
+            # Patching does not make the history fresher, so the entry keeps its age
+            self.analysis_cache.put(key, df, keep_age=True)
+            if self.candle_store is not None:
+                instrument = self._get_instrument_details(ticker)
+                self.candle_store.write(instrument['instrument_key'], 'day', df.iloc[-1:], refreshed=False)
+            return df
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            patched = dict(zip(quotes, pool.map(patch, quotes)))
+        self.flush_caches()
+        return patched
+
+    def cached_average_volume(self, ticker, period=20):
+        """Average daily volume from the local candle store only (None when nothing is stored)"""
+        instrument = self._get_instrument_details(ticker) if self.candle_store else None
+        if not instrument:
+            return None
+        df = self.candle_store.read(instrument['instrument_key'], 'day')
+        if len(df) < period:
+            return None
+        return float(df['volume'].iloc[-period:].mean())
+
+    def screen(self, universe=None, top_k=screen_top_k, rules=None, print_report=True):
+        """
+        Staged screen of `universe` (default: every NSE equity in the instrument
+        index) returning the top_k BUY signals and per-stage counts and timings.
+        """
+        from screener import run_screen
+
+        if universe is None:
+            universe = self.instruments.symbols() if self.instruments else list(self.SYMBOL_TO_ISIN)
+        result = run_screen(self, universe, k=top_k, rules=rules, print_report=print_report)
+        self.flush_caches()
+        return result
+
+    def get_candles(self, ticker, interval='day', days_back=100):
+        """Memoized get_ohlc_data; reused for candle_refresh_seconds by every analysis method"""
+        return self.analysis_cache.get_or_compute(
+            ('candles', ticker, interval, days_back),
+            lambda: self.get_ohlc_data(ticker, interval=interval, days_back=days_back),
+            ttl=self.candle_refresh_seconds,
+            count_as=('fetch', ticker),
+            cache_none=True  # A failed fetch is not retried by every later call in the same run
+        )
+
+    def get_indicator_frame(self, ticker, interval='day', days_back=100, df=None):
+        """
+        Candles with all indicator columns, memoized per (symbol, interval, bar range,
+        live bar) so a new or patched bar produces a new entry and repeated calls
+        reuse the same frame.
+        """
+        if df is None:
+            df = self.get_candles(ticker, interval=interval, days_back=days_back)
+        if df is None or df.empty:
+            return None
+        live_bar = tuple(df[['high', 'low', 'close', 'volume']].iloc[-1].tolist())
+        return self.analysis_cache.get_or_compute(
+            ('indicators', ticker, interval, df.index[0], df.index[-1], live_bar),
+            lambda: technicals_frame(df.copy()),
+            count_as=('compute', ticker)
+        )
+
+    def get_timeframe_candles(self, ticker, timeframes=mtf_timeframes, days_back=mtf_days_back):
+        """{timeframe: candles} resampled from a single memoized 1-minute fetch"""
+        minutes = self.get_candles(ticker, interval='1minute', days_back=days_back)
+        if minutes is None or minutes.empty:
+            return None
+        return {timeframe: resample(minutes, timeframe) for timeframe in timeframes}
+
+    def get_timeframe_technicals(self, ticker, timeframes=mtf_timeframes, days_back=mtf_days_back):
+        """get_technicals for each timeframe in `timeframes`, all from one 1-minute history"""
+        frames = self.get_timeframe_candles(ticker, timeframes, days_back)
+        if frames is None:
+            print(f"No 1-minute data for {ticker}")
+            return None
+        return {
+            timeframe: self.get_technicals(ticker, df=df, interval=timeframe)
+            for timeframe, df in frames.items()
+        }
+
+    def create_timeframe_state(self, ticker, timeframes=mtf_timeframes, days_back=mtf_days_back):
+        """MultiTimeframeState seeded from stored 1-minute history, updated with on_bar()"""
+        minutes = self.get_candles(ticker, interval='1minute', days_back=days_back)
+        if minutes is None or minutes.empty:
+            print(f"No 1-minute data for {ticker}")
+            return None
+        return MultiTimeframeState(ticker, minutes, timeframes)
+
+    @metrics.timed('get_technicals')
+    def get_technicals(self, ticker, df=None, interval='day'):
         """Technical analysis with Upstox API v2 data"""
         try:
-            df = self.get_ohlc_data(ticker)
+            # Calculate EMAs, ADX (requires 14 periods minimum) and volume analysis
+            df = self.get_indicator_frame(ticker, interval=interval, df=df)
             if df is None or len(df) < 50:  # Need sufficient data for indicators
                 print(f"Insufficient data for {ticker}")
                 return None
-                
-            # Calculate EMAs
-            df['9_ema'] = df['close'].ewm(span=9).mean()
-            df['21_ema'] = df['close'].ewm(span=21).mean()
-            df['50_ema'] = df['close'].ewm(span=50).mean()
-            
-            # Calculate ADX (requires 14 periods minimum)
-            df['tr'] = self._true_range(df)
-            df['atr'] = df['tr'].rolling(14).mean()
-            df['plus_dm'] = df['high'].diff()
-            df['minus_dm'] = -df['low'].diff()
-            df['plus_dm'] = df.apply(lambda x: x['plus_dm'] if x['plus_dm'] > x['minus_dm'] and x['plus_dm'] > 0 else 0, axis=1)
-            df['minus_dm'] = df.apply(lambda x: x['minus_dm'] if x['minus_dm'] > x['plus_dm'] and x['minus_dm'] > 0 else 0, axis=1)
-            df['plus_di'] = 100 * (df['plus_dm'].rolling(14).mean() / df['atr'])
-            df['minus_di'] = 100 * (df['minus_dm'].rolling(14).mean() / df['atr'])
-            df['dx'] = 100 * abs(df['plus_di'] - df['minus_di']) / (df['plus_di'] + df['minus_di'])
-            df['adx'] = df['dx'].rolling(14).mean()
-            
-            # Volume analysis
-            df['20_day_vol'] = df['volume'].rolling(20).mean()
-            df['rvol'] = df['volume'] / df['20_day_vol']
             
             latest = df.iloc[-1]  # Get most recent data
             
@@ -225,6 +480,7 @@ class SwingTraderPro:
             }
             
         except Exception as e:
+            metrics.inc('errors_total', method='get_technicals')
             print(f"Technical analysis error for {ticker}: {str(e)}")
             return None
 
@@ -235,21 +491,26 @@ class SwingTraderPro:
         tr3 = abs(df['low'] - df['close'].shift())
         return pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
 
-    def evaluate_trade(self, ticker, print_stats=True):
-        fundamentals = self.get_fundamentals(ticker)
+    @metrics.timed('evaluate_trade')
+    def evaluate_trade(self, ticker, print_stats=True, fundamentals=None, df=None, align_timeframes=None,
+                       technicals=None):
+        if fundamentals is None:
+            fundamentals = self.get_fundamentals(ticker)
         if not fundamentals or not all([
             fundamentals['debt_ok'],
             fundamentals['pe_ok'],
             # fundamentals['current_ratio_ok']
         ]):
-            rejection = {'ticker': ticker, 'decision': 'REJECT', 'reason': 'Fundamentals'}
+            reason = 'Fundamentals unavailable' if fundamentals and fundamentals.get('unavailable') else 'Fundamentals'
+            rejection = {'ticker': ticker, 'decision': 'REJECT', 'reason': reason}
             if print_stats:
                 print(f"\n🔴 {ticker} REJECTED - Failed Fundamentals:")
-                print(f"   Debt Ratio: {fundamentals.get('debt_ratio', 'N/A')}")
-                print(f"   P/E: {fundamentals.get('pe_ratio', 'N/A')}")
+                print(f"   Debt Ratio: {(fundamentals or {}).get('debt_ratio', 'N/A')}")
+                print(f"   P/E: {(fundamentals or {}).get('pe_ratio', 'N/A')}")
             return rejection
             
-        technicals = self.get_technicals(ticker)
+        if technicals is None:  # Precomputed summaries (e.g. IndicatorState.technicals()) skip the frame path
+            technicals = self.get_technicals(ticker, df=df)
         if not technicals:
             rejection = {'ticker': ticker, 'decision': 'REJECT', 'reason': 'Technical data'}
             if print_stats:
@@ -262,6 +523,16 @@ class SwingTraderPro:
         ema_alignment = technicals['ema_crossover']
         volume_ok = technicals['rvol'] > 0.3
         
+        if all([adx_ok, trend_strength, ema_alignment, volume_ok]) and align_timeframes:
+            # Intraday confirmation: every requested timeframe must agree with the daily trend
+            timeframe_technicals = self.get_timeframe_technicals(ticker, align_timeframes)
+            if not timeframe_technicals or not timeframes_aligned(timeframe_technicals):
+                decision = {'ticker': ticker, 'decision': 'HOLD', 'reason': 'Timeframes not aligned',
+                            'adx': round(technicals['adx'], 2), 'rvol': round(technicals['rvol'], 2), 'atr': round(technicals['atr'], 2)}
+                if print_stats:
+                    print(f"\n🟠 {ticker} HOLD - Daily signal not confirmed on {', '.join(align_timeframes)}")
+                return decision
+
         if all([adx_ok, trend_strength, ema_alignment, volume_ok]):
             # Risk management calculations
             entry = technicals['current_price']
@@ -290,16 +561,20 @@ class SwingTraderPro:
                 print(f"   Trend Strength (ADX): {round(technicals['adx'], 1)}")
                 print(f"   Volume (RVOL): {round(technicals['rvol'], 1)}x")
                 print(f"   EMA Alignment: 9EMA > 21EMA > 50EMA")
-                
+
+            if self.alerts:
+                self.alerts.submit(trade_stats)
             return trade_stats
             
         elif technicals['adx'] < 20:
-            decision = {'ticker': ticker, 'decision': 'WAIT', 'reason': 'Weak trend (ADX < 20)'}
+            decision = {'ticker': ticker, 'decision': 'WAIT', 'reason': 'Weak trend (ADX < 20)',
+                        'adx': round(technicals['adx'], 2), 'rvol': round(technicals['rvol'], 2), 'atr': round(technicals['atr'], 2)}
             if print_stats:
                 print(f"\n🟡 {ticker} WAIT - Weak Trend (ADX: {round(technicals['adx'], 1)})")
             return decision
         else:
-            decision = {'ticker': ticker, 'decision': 'HOLD', 'reason': 'Waiting for confirmation'}
+            decision = {'ticker': ticker, 'decision': 'HOLD', 'reason': 'Waiting for confirmation',
+                        'adx': round(technicals['adx'], 2), 'rvol': round(technicals['rvol'], 2), 'atr': round(technicals['atr'], 2)}
             if print_stats:
                 print(f"\n🟠 {ticker} HOLD - Insufficient Confirmation")
                 print(f"   ADX: {round(technicals['adx'], 1)} (Needs >25)")
@@ -307,15 +582,137 @@ class SwingTraderPro:
                 print(f"   RVOL: {round(technicals['rvol'], 1)}x (Needs >1.5x)")
             return decision
 
+    def scan(self, watchlist, print_stats=False, live=False):
+        """
+        Evaluate a whole watchlist with fundamentals and OHLC fetches running
+        concurrently on a bounded thread pool. A failing symbol is reported as
+        an ERROR decision without stopping the rest of the scan. With live=True
+        today's bar is first refreshed from batched quotes (refresh_live_bars).
+        """
+        if live:
+            self.refresh_live_bars(watchlist)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pending = {
+                ticker: (pool.submit(self.get_fundamentals, ticker), pool.submit(self.get_candles, ticker))
+                for ticker in watchlist
+            }
+            results = []
+            for ticker, (fundamentals_future, ohlc_future) in pending.items():
+                try:
+                    results.append(self.evaluate_trade(
+                        ticker,
+                        print_stats=print_stats,
+                        fundamentals=fundamentals_future.result(),
+                        df=ohlc_future.result()
+                    ))
+                except Exception as e:
+                    print(f"Scan error for {ticker}: {str(e)}")
+                    results.append({'ticker': ticker, 'decision': 'ERROR', 'reason': str(e)})
+        if self.journal:
+            self.journal.record(results)
+        self.flush_caches()
+        return results
+
+    def flush_caches(self):
+        """Persist the candle store index and pending fundamentals once per batch"""
+        if self.candle_store:
+            self.candle_store.flush()
+        if self.fundamentals_cache:
+            self.fundamentals_cache.flush()
+
+    def backtest(self, watchlist, days_back=3650, **rules):
+        """Replay the evaluate_trade rules over stored history for a whole watchlist"""
+        from backtest import backtest_frames
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            histories = pool.map(lambda t: self.get_candles(t, days_back=days_back), watchlist)
+            frames = dict(zip(watchlist, histories))
+        return backtest_frames(frames, **rules)
+
+    def optimize(self, watchlist, grid=None, days_back=3650, workers=None, output_path='sweep_results.csv'):
+        """Sweep signal thresholds over stored history on a process pool and rank the results"""
+        from sweep import run_sweep
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            histories = pool.map(lambda t: self.get_candles(t, days_back=days_back), watchlist)
+            frames = dict(zip(watchlist, histories))
+        fundamentals = {}
+        if self.fundamentals_cache:
+            self.prefetch_fundamentals(watchlist)
+            fundamentals = {t: self.fundamentals_cache.get(t) for t in watchlist}
+        return run_sweep(frames, grid=grid, fundamentals=fundamentals, workers=workers, output_path=output_path)
+
+    def create_stream(self, watchlist, record_path=None):
+        """
+        Seed an IndicatorState per symbol from stored history and return a
+        QuoteFeed that updates them from market-quote messages.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            histories = dict(zip(watchlist, pool.map(self.get_candles, watchlist)))
+        states = {}
+        for ticker, df in histories.items():
+            instrument = self._get_instrument_details(ticker)
+            if not instrument or df is None or df.empty:
+                print(f"Skipping {ticker} in live stream: no history")
+                continue
+            states[instrument['instrument_key']] = IndicatorState.from_frame(df, symbol=ticker)
+        self.flush_caches()
+        return QuoteFeed(states, record_path=record_path)
+
+    def load_panel(self, watchlist, interval='day', days_back=None, lookback=None):
+        """
+        Compact UniversePanel (float32 by default, bounded to panel_lookback bars)
+        for a whole universe. Histories are fetched without being memoized so
+        only the panel stays resident.
+        """
+        from universe_panel import UniversePanel
+
+        panel = UniversePanel(watchlist, **({'lookback': lookback} if lookback else {}))
+        days_back = days_back or int(panel.lookback * 1.5)  # Calendar days covering `lookback` sessions
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            histories = pool.map(lambda t: self.get_ohlc_data(t, interval=interval, days_back=days_back), watchlist)
+            panel.load(dict(zip(watchlist, histories)))
+        self.flush_caches()
+        return panel
+
+    def refresh_panel(self, panel):
+        """Write today's bar from batched market quotes into a daily UniversePanel"""
+        for ticker, quote in self.get_quotes(panel.symbols).items():
+            ohlc = quote['ohlc']
+            timestamp = pd.Timestamp(quote_date(quote)).tz_localize('Asia/Kolkata')
+            panel.update(ticker, timestamp, ohlc['open'], ohlc['high'], ohlc['low'], quote['last_price'], quote['volume'])
+        return panel
+
+    def evaluate_panel(self, panel, print_stats=False):
+        """evaluate_trade for every panel symbol using the panel's latest indicator values"""
+        results = []
+        for ticker, technicals in panel.latest().items():
+            try:
+                results.append(self.evaluate_trade(ticker, print_stats=print_stats, technicals=technicals))
+            except Exception as e:
+                print(f"Panel error for {ticker}: {str(e)}")
+                results.append({'ticker': ticker, 'decision': 'ERROR', 'reason': str(e)})
+        if self.journal:
+            self.journal.record(results)
+        return results
+
+    def render_charts(self, watchlist, output_dir=chart_output_dir, fmt=chart_format, workers=None):
+        """Write the plot_technicals chart for every symbol to image files without a display"""
+        from charts import render_charts
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            frames = dict(zip(watchlist, pool.map(self.get_indicator_frame, watchlist)))
+        return render_charts(frames, output_dir, fmt=fmt, workers=workers)
+
     def plot_technicals(self, ticker):
-        df = self.get_ohlc_data(ticker)
-        if df is None or df.empty:
+        import matplotlib.pyplot as plt  # Loaded only when charts are drawn
+
+        # Indicator frame shared with get_technicals/evaluate_trade
+        df = self.get_indicator_frame(ticker)
+        if df is None:
             print(f"No data for {ticker}")
             return
         
-        # Calculate all technical indicators
-        df = self._calculate_technicals(df)
-        
         # Create figure
         plt.figure(figsize=(12, 10))
         
@@ -352,28 +749,16 @@ class SwingTraderPro:
         time.sleep(0.1)  # Prevent plot from closing immediately
 
     def _calculate_technicals(self, df):
-        """Calculate all technical indicators for plotting"""
-        # EMAs
-        df['9_ema'] = df['close'].ewm(span=9, adjust=False).mean()
-        df['21_ema'] = df['close'].ewm(span=21, adjust=False).mean()
-        df['50_ema'] = df['close'].ewm(span=50, adjust=False).mean()
-        
-        # Volume
-        df['20_day_vol'] = df['volume'].rolling(20).mean()
-        
-        # ADX Calculation
-        df['tr'] = self._true_range(df)
-        df['atr'] = df['tr'].rolling(14).mean()
-        df['plus_dm'] = df['high'].diff().clip(lower=0)
-        df['minus_dm'] = (-df['low'].diff()).clip(lower=0)
-        df['plus_di'] = 100 * (df['plus_dm'].rolling(14).mean() / df['atr'])
-        df['minus_di'] = 100 * (df['minus_dm'].rolling(14).mean() / df['atr'])
-        df['dx'] = 100 * abs(df['plus_di'] - df['minus_di']) / (df['plus_di'] + df['minus_di'])
-        df['adx'] = df['dx'].rolling(14).mean()
-        
-        return df
+        """Calculate all technical indicators for plotting (same definitions as get_technicals)"""
+        return technicals_frame(df)
     
 if __name__ == "__main__":
+    # Optional observability: metrics endpoint and sampling profiler (see config.py)
+    if metrics_port:
+        metrics.enable()
+        metrics.serve(metrics_port)
+    profiler = SamplingProfiler().start() if profile_output else None
+
     # Initialize with your Upstox credentials
     trader = SwingTraderPro(
         client_id="your_client_id",  # From Upstox developer console
@@ -381,6 +766,9 @@ if __name__ == "__main__":
         )
 
     watchlist = ['HDFCBANK']
+
+    # Warm the fundamentals cache before the scan
+    trader.prefetch_fundamentals(watchlist)
     
     for symbol in watchlist:
         print(f"\nAnalyzing {symbol}...")
@@ -393,7 +781,10 @@ if __name__ == "__main__":
         decision = trader.evaluate_trade(symbol)
         print(decision)
 
-    results = [trader.evaluate_trade(ticker) for ticker in watchlist]
+    results = trader.scan(watchlist, print_stats=True)
+
+    # Each symbol should be fetched and computed once across all the calls above
+    print(trader.analysis_cache.stats())
     
     print("\nActionable Trades:")
     print(results)
@@ -404,4 +795,14 @@ if __name__ == "__main__":
             print(f"  Stop Loss: {trade['stop_loss']}")
             print(f"  Target: {trade['target']}")
             print(f"  ADX: {trade['adx']} (Trend Strength)")
-            print(f"  Volume: {trade['rvol']:.2f}x average")
\ No newline at end of file
+            print(f"  Volume: {trade['rvol']:.2f}x average")
+
+    if trader.journal:
+        trader.journal.close()
+
+    if trader.alerts:
+        trader.alerts.close()
+        print(trader.alerts.stats())
+
+    if profiler:
+        profiler.stop().dump(profile_output)
@@ -0,0 +1,126 @@
+import heapq
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import screen_rules, screen_top_k
+
+
+def prefilter(quotes, averages, rules):
+    """
+    Stage 1 gate on bulk quote data: price band, traded value today and the
+    cached average daily volume (skipped for symbols with no stored history).
+    """
+    survivors = []
+    for ticker, quote in quotes.items():
+        price, volume = quote['last_price'], quote['volume']
+        if not rules['min_price'] <= price <= rules['max_price']:
+            continue
+        if price * volume < rules['min_turnover']:
+            continue
+        average = averages.get(ticker)
+        if average is not None and average < rules['min_avg_volume']:
+            continue
+        survivors.append(ticker)
+    return survivors
+
+
+def signal_strength(decision):
+    """Rank key for BUY decisions: trend strength weighted by relative volume (capped at 3x)"""
+    return decision['adx'] * min(decision['rvol'], 3.0)
+
+
+def top_k(decisions, k):
+    """The k strongest BUY decisions, using a bounded min-heap"""
+    heap = []
+    for i, decision in enumerate(decisions):
+        if decision.get('decision') != 'BUY':
+            continue
+        item = (signal_strength(decision), i, decision)
+        if len(heap) < k:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+    return [decision for _, _, decision in sorted(heap, reverse=True)]
+
+
+def _guarded(fn, errors):
+    """Wrap a per-symbol call so an exception rejects only that symbol, recorded as an ERROR decision"""
+    def call(ticker):
+        try:
+            return fn(ticker)
+        except Exception as e:
+            print(f"Screen error for {ticker}: {str(e)}")
+            errors.append({'ticker': ticker, 'decision': 'ERROR', 'reason': str(e)})
+            return None
+    return call
+
+
+class Funnel:
+    """Per-stage symbol counts and timings"""
+
+    def __init__(self, universe_size):
+        self.remaining = universe_size
+        self.stages = []
+
+    def record(self, stage, survivors, started):
+        removed = self.remaining - len(survivors)
+        self.stages.append({
+            'stage': stage, 'in': self.remaining, 'removed': removed,
+            'out': len(survivors), 'seconds': round(time.perf_counter() - started, 4),
+        })
+        self.remaining = len(survivors)
+
+    def report(self):
+        for s in self.stages:
+            print(f"{s['stage']:<14} {s['in']:>6} in  {s['removed']:>6} removed  {s['out']:>6} left  {s['seconds']:.3f}s")
+
+
+def run_screen(trader, universe, k=screen_top_k, rules=None, print_report=True):
+    """
+    Screen `universe` in three stages so the expensive per-symbol work only
+    runs on the few names that can still qualify:
+
+    1. bulk quotes + cached average volume (one request per 500 symbols)
+    2. cached fundamentals gates from sector_params
+    3. full history fetch and the evaluate_trade ADX/EMA/RVOL rules
+
+    A symbol that fails in stage 2 or 3 is dropped on its own and journaled
+    as an ERROR decision. Returns {'top': k strongest BUY decisions,
+    'stages': per-stage counts/timings, 'errors': ERROR decisions}.
+    """
+    rules = {**screen_rules, **(rules or {})}
+    funnel = Funnel(len(universe))
+    errors = []
+
+    started = time.perf_counter()
+    quotes = trader.get_quotes(universe)
+    averages = {ticker: trader.cached_average_volume(ticker) for ticker in quotes}
+    survivors = prefilter(quotes, averages, rules)
+    funnel.record('prefilter', survivors, started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=trader.max_workers) as pool:
+        fundamentals = dict(zip(survivors, pool.map(_guarded(trader.get_fundamentals, errors), survivors)))
+    survivors = [t for t in survivors if fundamentals[t] and fundamentals[t]['debt_ok'] and fundamentals[t]['pe_ok']]
+    if trader.fundamentals_cache:
+        trader.fundamentals_cache.flush()
+    funnel.record('fundamentals', survivors, started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=trader.max_workers) as pool:
+        histories = dict(zip(survivors, pool.map(_guarded(trader.get_candles, errors), survivors)))
+    failed = {error['ticker'] for error in errors}
+    evaluate = _guarded(
+        lambda ticker: trader.evaluate_trade(ticker, print_stats=False, fundamentals=fundamentals[ticker], df=histories[ticker]),
+        errors
+    )
+    decisions = [evaluate(ticker) for ticker in survivors if ticker not in failed]
+    decisions = [decision for decision in decisions if decision]
+    if trader.journal:
+        trader.journal.record(decisions + errors)
+    top = top_k(decisions, k)
+    funnel.record('technicals', top, started)
+
+    if print_report:
+        funnel.report()
+    return {'top': top, 'stages': funnel.stages, 'errors': errors}
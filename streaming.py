@@ -0,0 +1,263 @@
+import json
+import math
+from collections import deque
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from indicators import EMA_SPANS, ADX_PERIOD, VOLUME_PERIOD
+
+NAN = float('nan')
+MARKET_TZ = ZoneInfo('Asia/Kolkata')
+STATE_VERSION = 2  # Bumped when IndicatorState's pickled layout changes
+
+
+class RollingWindow:
+    """
+    Last `size` committed values with a running sum of the finite ones.
+    The sum is recomputed exactly once per `size` appends so float drift
+    stays bounded while each append remains O(1) amortized.
+    """
+
+    def __init__(self, size):
+        self.values = deque(maxlen=size)
+        self.total = 0.0
+        self.non_finite = 0
+        self.appends = 0
+
+    def __len__(self):
+        return len(self.values)
+
+    def append(self, value):
+        size = self.values.maxlen
+        if size == 0:
+            return
+        if len(self.values) == size:
+            old = self.values[0]
+            if math.isfinite(old):
+                self.total -= old
+            else:
+                self.non_finite -= 1
+        self.values.append(value)
+        if math.isfinite(value):
+            self.total += value
+        else:
+            self.non_finite += 1
+        self.appends += 1
+        if self.appends >= size:
+            self.total = math.fsum(v for v in self.values if math.isfinite(v))
+            self.appends = 0
+
+
+def _window_mean(window, value, period):
+    """Mean of the committed window plus one candidate value (NaN until full)"""
+    if len(window) + 1 < period:
+        return NAN
+    if window.non_finite or not math.isfinite(value):
+        # NaN/inf propagate exactly as in a pandas rolling mean
+        return (value + sum(window.values)) / period
+    return (window.total + value) / period
+
+
+def _div(a, b):
+    try:
+        return a / b
+    except ZeroDivisionError:
+        return NAN if a == 0 or math.isnan(a) else math.copysign(math.inf, a)
+
+
+class IndicatorState:
+    """
+    Incremental EMA 9/21/50, ATR/DI/ADX and 20-bar volume average for one symbol.
+
+    Closed bars are committed with close_bar(); the forming bar can be updated
+    any number of times with update() and is evaluated against the committed
+    state without touching history, so every tick costs a fixed amount of work.
+    Values match get_technicals on the same bars.
+    """
+
+    def __init__(self, symbol, ema_spans=EMA_SPANS, period=ADX_PERIOD, volume_period=VOLUME_PERIOD):
+        self.symbol = symbol
+        self.ema_spans = ema_spans
+        self.period = period
+        self.volume_period = volume_period
+        self.decay = {span: 1.0 - 2.0 / (span + 1.0) for span in ema_spans}
+
+        # Committed state
+        self.ema_num = {span: 0.0 for span in ema_spans}
+        self.ema_den = {span: 0.0 for span in ema_spans}
+        self.prev_high = self.prev_low = self.prev_close = None
+        self.tr = RollingWindow(period - 1)
+        self.plus_dm = RollingWindow(period - 1)
+        self.minus_dm = RollingWindow(period - 1)
+        self.dx = RollingWindow(period - 1)
+        self.volume = RollingWindow(volume_period - 1)
+        self.bars = 0
+
+        # Forming bar
+        self.bar = None
+        self.bar_key = None
+        self.values = None
+
+    @classmethod
+    def from_frame(cls, df, **kwargs):
+        """
+        Seed the state from a get_ohlc_data DataFrame. The last row stays the
+        forming bar so quotes for the same trading day keep updating it.
+        `bar_key` maps each row's timestamp to its bar key (the date by default).
+        """
+        bar_key = kwargs.pop('bar_key', lambda ts: ts.date())
+        state = cls(kwargs.pop('symbol', None), **kwargs)
+        rows = df[['open', 'high', 'low', 'close', 'volume']].itertuples()
+        for i, (timestamp, *bar) in enumerate(rows):
+            if i:
+                state.close_bar()
+            state.update(*bar, bar_key=bar_key(timestamp))
+        return state
+
+    def _evaluate(self, high, low, close, volume):
+        """Compute indicator values for a candidate bar on top of committed state"""
+        if self.prev_close is None:
+            tr = high - low
+            plus_dm = minus_dm = 0.0
+        else:
+            tr = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+            up = high - self.prev_high
+            down = self.prev_low - low
+            plus_dm = up if up > down and up > 0 else 0.0
+            minus_dm = down if down > plus_dm and down > 0 else 0.0
+
+        atr = _window_mean(self.tr, tr, self.period)
+        plus_di = 100 * _div(_window_mean(self.plus_dm, plus_dm, self.period), atr)
+        minus_di = 100 * _div(_window_mean(self.minus_dm, minus_dm, self.period), atr)
+        dx = 100 * _div(abs(plus_di - minus_di), plus_di + minus_di)
+        adx = _window_mean(self.dx, dx, self.period)
+        vol_avg = _window_mean(self.volume, volume, self.volume_period)
+
+        emas = {
+            span: (self.ema_num[span] * self.decay[span] + close) / (self.ema_den[span] * self.decay[span] + 1)
+            for span in self.ema_spans
+        }
+        values = {f'{span}_ema': value for span, value in emas.items()}
+        values.update({
+            'tr': tr, 'plus_dm': plus_dm, 'minus_dm': minus_dm,
+            'atr': atr, 'plus_di': plus_di, 'minus_di': minus_di,
+            'dx': dx, 'adx': adx, f'{self.volume_period}_day_vol': vol_avg,
+            'rvol': _div(volume, vol_avg), 'close': close, 'volume': volume,
+        })
+        return values
+
+    def update(self, open_, high, low, close, volume, bar_key=None):
+        """Update the forming bar (tick or partial bar) and return the latest values"""
+        self.bar = (open_, high, low, close, volume)
+        self.bar_key = bar_key
+        self.values = self._evaluate(high, low, close, volume)
+        return self.values
+
+    def close_bar(self):
+        """Commit the forming bar to history"""
+        if self.bar is None:
+            return
+        _, high, low, close, volume = self.bar
+        values = self.values
+        for span in self.ema_spans:
+            self.ema_num[span] = self.ema_num[span] * self.decay[span] + close
+            self.ema_den[span] = self.ema_den[span] * self.decay[span] + 1
+        self.tr.append(values['tr'])
+        self.plus_dm.append(values['plus_dm'])
+        self.minus_dm.append(values['minus_dm'])
+        self.dx.append(values['dx'])
+        self.volume.append(volume)
+        self.prev_high, self.prev_low, self.prev_close = high, low, close
+        self.bars += 1
+        self.bar = None
+
+    def technicals(self):
+        """Latest values in the get_technicals summary format"""
+        v = self.values
+        if v is None:
+            return None
+        return {
+            'adx': v['adx'],
+            'plus_di': v['plus_di'],
+            'minus_di': v['minus_di'],
+            'ema_crossover': v['9_ema'] > v['21_ema'] > v['50_ema'],
+            'price_above_ema': v['close'] > v['9_ema'],
+            'rvol': v['rvol'],
+            'atr': v['atr'],
+            'current_price': v['close']
+        }
+
+
+class QuoteFeed:
+    """
+    Drives IndicatorState objects from Upstox /market-quote/quotes messages.
+
+    Each message is the `data` mapping of a quotes response. The quote's day
+    OHLC and volume form the partial daily bar; when a quote arrives for a new
+    trading day the previous bar is committed first.
+    """
+
+    def __init__(self, states, record_path=None):
+        # states: {instrument_key: IndicatorState}
+        self.states = states
+        self.record_path = record_path
+
+    def on_message(self, message):
+        """Apply one quotes `data` mapping; returns the symbols that were updated"""
+        if self.record_path:
+            with open(self.record_path, 'a') as f:
+                f.write(json.dumps(message) + '\n')
+
+        updated = []
+        for quote in message.values():
+            state = self.states.get(quote.get('instrument_token'))
+            if state is None:
+                continue
+            ohlc = quote['ohlc']
+            bar_key = quote_date(quote)
+            if state.bar is not None and state.bar_key != bar_key:
+                state.close_bar()
+            state.update(ohlc['open'], ohlc['high'], ohlc['low'], quote['last_price'], quote['volume'], bar_key=bar_key)
+            updated.append(state.symbol)
+        return updated
+
+    def replay(self, path):
+        """Feed recorded messages (one JSON object per line) through the states"""
+        record_path, self.record_path = self.record_path, None
+        try:
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        self.on_message(json.loads(line))
+        finally:
+            self.record_path = record_path
+
+
+def quote_date(quote):
+    """IST trading date of a quote from its ISO timestamp or epoch-ms last_trade_time"""
+    if quote.get('timestamp'):
+        timestamp = datetime.fromisoformat(quote['timestamp'])
+        return (timestamp.astimezone(MARKET_TZ) if timestamp.tzinfo else timestamp).date()
+    return datetime.fromtimestamp(int(quote['last_trade_time']) / 1000, tz=MARKET_TZ).date()
+
+
+def patch_live_bar(df, quote, tz='Asia/Kolkata'):
+    """
+    Return daily candles `df` with the quote's day bar (day OHLC, last price,
+    volume) replacing the bar for the same date or appended as a new one.
+    Quotes older than the last stored bar are ignored.
+    """
+    ohlc = quote['ohlc']
+    timestamp = pd.Timestamp(quote_date(quote)).tz_localize(tz)
+    bar = {
+        'open': ohlc['open'], 'high': ohlc['high'], 'low': ohlc['low'],
+        'close': quote['last_price'], 'volume': quote['volume'], 'oi': quote.get('oi', 0),
+    }
+    if len(df) and timestamp < df.index[-1]:
+        return df
+    row = pd.DataFrame([bar], index=pd.DatetimeIndex([timestamp], name=df.index.name)).astype(df.dtypes.to_dict())
+    if len(df) and timestamp == df.index[-1]:
+        return pd.concat([df.iloc[:-1], row])
+    return pd.concat([df, row])
@@ -0,0 +1,176 @@
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backtest import signal_mask, simulate_trades, trade_stats
+from config import sector_params
+from indicators import build_panel, compute_indicators, ema, synthetic_frames
+
+# Indicator outputs that do not depend on any swept parameter
+BASE_FIELDS = ('atr', 'adx', 'plus_di', 'minus_di', 'rvol')
+PRICE_FIELDS = ('open', 'high', 'low', 'close')
+
+DEFAULT_GRID = {
+    'ema_fast': [9],
+    'ema_mid': [21],
+    'ema_slow': [50],
+    'adx_min': [20, 25, 30],
+    'rvol_min': [0.3, 1.0, 1.5],
+    'stop_atr': [1.5, 2, 3],
+    'target_atr': [3, 4, 6],
+    'fundamentals_scale': [1.0],
+}
+
+
+class SharedPanel:
+    """
+    Named float64 arrays packed into one shared-memory block.
+
+    The parent creates it once; worker processes attach by name and get
+    zero-copy NumPy views instead of a pickled copy of the candles.
+    """
+
+    def __init__(self, shm, layout, owner):
+        self.shm = shm
+        self.layout = layout
+        self.owner = owner
+        self.arrays = {
+            name: np.ndarray(shape, dtype=np.float64, buffer=shm.buf, offset=offset)
+            for name, (offset, shape) in layout.items()
+        }
+
+    @classmethod
+    def create(cls, arrays):
+        layout, offset = {}, 0
+        for name, arr in arrays.items():
+            layout[name] = (offset, arr.shape)
+            offset += arr.size * 8
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        panel = cls(shm, layout, owner=True)
+        for name, arr in arrays.items():
+            panel.arrays[name][...] = arr
+        return panel
+
+    @classmethod
+    def attach(cls, spec):
+        name, layout = spec
+        return cls(shared_memory.SharedMemory(name=name), layout, owner=False)
+
+    @property
+    def spec(self):
+        return self.shm.name, self.layout
+
+    def close(self):
+        self.arrays = {}
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+_worker_panel = None
+
+
+def _init_worker(spec):
+    global _worker_panel
+    _worker_panel = SharedPanel.attach(spec)
+
+
+def _evaluate_combo(params, arrays=None):
+    """Backtest one parameter combination against the shared panel"""
+    arrays = arrays if arrays is not None else _worker_panel.arrays
+    indicators = {field: arrays[field] for field in BASE_FIELDS}
+    indicators['9_ema'] = arrays[f"ema_{params['ema_fast']}"]
+    indicators['21_ema'] = arrays[f"ema_{params['ema_mid']}"]
+    indicators['50_ema'] = arrays[f"ema_{params['ema_slow']}"]
+
+    signals = signal_mask(indicators, params['adx_min'], params['rvol_min'])
+    scale = params['fundamentals_scale']
+    passes = (arrays['debt'] < arrays['debt_max'] * scale) & (arrays['pe'] < arrays['pe_max'] * scale)
+    signals &= passes[:, None]
+
+    panel = {field: arrays[field] for field in PRICE_FIELDS}
+    trades = simulate_trades(panel, arrays['atr'], signals, params['stop_atr'], params['target_atr'])
+    return {**params, **trade_stats(trades)}
+
+
+def fundamentals_arrays(symbols, fundamentals=None):
+    """Per-symbol debt/PE values and sector limits, using get_fundamentals defaults for gaps"""
+    fundamentals = fundamentals or {}
+    index = {k.lower(): v for k, v in sector_params.items()}
+    debt, pe, debt_max, pe_max = (np.empty(len(symbols)) for _ in range(4))
+    for row, symbol in enumerate(symbols):
+        info = fundamentals.get(symbol)
+        if info is None:
+            # No fundamentals supplied: never filter the symbol out
+            debt[row], pe[row], debt_max[row], pe_max[row] = -np.inf, -np.inf, 0, 0
+            continue
+        params = index.get((info.get('sector') or 'default').strip().lower(), sector_params['default'])
+        debt[row] = info.get('debtToEquity') if info.get('debtToEquity') is not None else 0
+        pe[row] = info.get('trailingPE') if info.get('trailingPE') is not None else 100
+        debt_max[row], pe_max[row] = params['debt_equity_max'], params['pe_max']
+    return {'debt': debt, 'pe': pe, 'debt_max': debt_max, 'pe_max': pe_max}
+
+
+def expand_grid(grid):
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def run_sweep(frames, grid=None, fundamentals=None, workers=None, rank_by='expectancy_r', output_path=None):
+    """
+    Backtest every combination in `grid` across a process pool.
+
+    Indicators that don't depend on the swept thresholds (ATR, DI, ADX, RVOL)
+    and one EMA per distinct span are computed once up front and published
+    with the candles in shared memory. Returns the ranked results table and
+    optionally writes it to `output_path` as CSV.
+    """
+    grid = {**DEFAULT_GRID, **(grid or {})}
+    combos = expand_grid(grid)
+    symbols, panel = build_panel(frames)
+
+    indicators = compute_indicators(panel['high'], panel['low'], panel['close'], panel['volume'])
+    arrays = {field: panel[field] for field in PRICE_FIELDS}
+    arrays.update({field: indicators[field] for field in BASE_FIELDS})
+    spans = set(grid['ema_fast']) | set(grid['ema_mid']) | set(grid['ema_slow'])
+    arrays.update({f'ema_{span}': ema(panel['close'], span) for span in spans})
+    arrays.update(fundamentals_arrays(symbols, fundamentals))
+
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        results = [_evaluate_combo(params, arrays) for params in combos]
+    else:
+        shared = SharedPanel.create(arrays)
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shared.spec,)) as pool:
+                chunksize = max(1, len(combos) // (workers * 4))
+                results = list(pool.map(_evaluate_combo, combos, chunksize=chunksize))
+        finally:
+            shared.close()
+
+    table = pd.DataFrame(results).sort_values(rank_by, ascending=False, ignore_index=True)
+    if output_path:
+        table.to_csv(output_path, index=False)
+    return table
+
+
+def benchmark(n_symbols=500, n_bars=1000):
+    """Sweep the default grid with one worker and with every core"""
+    frames = synthetic_frames(n_symbols, n_bars)
+    timings = {}
+    for workers in sorted({1, os.cpu_count()}):
+        start = time.perf_counter()
+        table = run_sweep(frames, workers=workers)
+        timings[workers] = time.perf_counter() - start
+        print(f"{len(table)} combinations, {workers} worker(s): {timings[workers]:.2f}s")
+    print(table.head(5).to_string())
+    return timings
+
+
+if __name__ == "__main__":
+    benchmark()
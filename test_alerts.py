@@ -0,0 +1,125 @@
+import json
+import time
+
+from alerts import AlertDispatcher, FileTransport, StubTransport
+
+
+def buy(ticker, entry=100.0):
+    return {'ticker': ticker, 'decision': 'BUY', 'entry': entry, 'stop_loss': entry - 2,
+            'target': entry + 4, 'risk_reward': 2.0}
+
+
+def dispatcher(transport, **kwargs):
+    options = {'dedupe_seconds': 60, 'batch_seconds': 0.2, 'max_retries': 2, 'backoff': 0.01}
+    options.update(kwargs)
+    return AlertDispatcher(transport, **options)
+
+
+def test_batch_is_coalesced_into_one_message():
+    transport = StubTransport()
+    alerts = dispatcher(transport)
+    for ticker in ('AAA', 'BBB', 'CCC'):
+        alerts.submit(buy(ticker))
+    alerts.close()
+
+    assert len(transport.sent) == 1
+    text, signals = transport.sent[0]
+    assert [s['ticker'] for s in signals] == ['AAA', 'BBB', 'CCC']
+    assert text.splitlines()[0] == 'BUY AAA @ 100.0 SL 98.0 T 104.0 (R:R 2.0)'
+    assert alerts.stats()['sent'] == 3
+    assert alerts.stats()['messages'] == 1
+
+
+def test_duplicates_in_a_batch_keep_the_latest_signal():
+    transport = StubTransport()
+    alerts = dispatcher(transport)
+    alerts.submit(buy('AAA', entry=100.0))
+    alerts.submit(buy('AAA', entry=101.0))
+    alerts.close()
+
+    _, signals = transport.sent[0]
+    assert [s['entry'] for s in signals] == [101.0]
+    assert alerts.stats()['deduplicated'] == 1
+    assert alerts.stats()['sent'] == 1
+
+
+def test_signal_is_not_resent_within_dedupe_window():
+    transport = StubTransport()
+    alerts = dispatcher(transport, batch_seconds=0.05)
+    alerts.submit(buy('AAA'))
+    time.sleep(0.3)
+    alerts.submit(buy('AAA'))
+    alerts.submit({'ticker': 'AAA', 'decision': 'HOLD', 'reason': 'Waiting for confirmation'})
+    alerts.close()
+
+    assert len(transport.sent) == 2
+    assert [s['decision'] for s in transport.sent[1][1]] == ['HOLD']
+    assert alerts.stats()['deduplicated'] == 1
+
+
+def test_failed_send_is_retried_with_backoff():
+    transport = StubTransport(failures=2)
+    alerts = dispatcher(transport, backoff=0.05)
+    started = time.perf_counter()
+    alerts.submit(buy('AAA'))
+    alerts.close()
+
+    assert len(transport.sent) == 1
+    assert alerts.stats()['sent'] == 1
+    assert alerts.stats()['failed'] == 0
+    # Two retries wait backoff * 1 then backoff * 2
+    assert time.perf_counter() - started >= 0.15
+
+
+def test_gives_up_after_max_retries():
+    transport = StubTransport(failures=5)
+    alerts = dispatcher(transport, max_retries=2)
+    alerts.submit(buy('AAA'))
+    alerts.submit(buy('BBB'))
+    alerts.close()
+
+    assert transport.sent == []
+    assert transport.failures == 2
+    assert alerts.stats()['failed'] == 2
+    assert alerts.stats()['sent'] == 0
+
+
+def test_failed_signal_is_not_deduplicated_on_the_next_scan():
+    transport = StubTransport(failures=1)
+    alerts = dispatcher(transport, max_retries=0, batch_seconds=0.05)
+    alerts.submit(buy('AAA'))
+    time.sleep(0.3)
+    alerts.submit(buy('AAA'))
+    alerts.close()
+
+    assert len(transport.sent) == 1
+    assert alerts.stats()['failed'] == 1
+    assert alerts.stats()['deduplicated'] == 0
+
+
+def test_submit_does_not_wait_for_a_slow_transport():
+    transport = StubTransport(delay=0.5)
+    alerts = dispatcher(transport, batch_seconds=0.0)
+    started = time.perf_counter()
+    for i in range(100):
+        alerts.submit(buy(f'T{i}'))
+    assert time.perf_counter() - started < 0.1
+    alerts.close()
+
+
+def test_full_queue_drops_instead_of_blocking():
+    transport = StubTransport(delay=0.5)
+    alerts = dispatcher(transport, batch_seconds=0.0, maxsize=1)
+    results = [alerts.submit(buy(f'T{i}')) for i in range(5)]
+    alerts.close()
+
+    assert results.count(False) == alerts.stats()['dropped'] > 0
+
+
+def test_file_transport_creates_parent_directory(tmp_path):
+    path = tmp_path / 'nested' / 'alerts.jsonl'
+    FileTransport(str(path)).send('BUY AAA', [buy('AAA')])
+
+    line = json.loads(path.read_text().splitlines()[0])
+    assert line['text'] == 'BUY AAA'
+    assert line['signals'][0]['ticker'] == 'AAA'
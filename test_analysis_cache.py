@@ -0,0 +1,55 @@
+import threading
+
+import pytest
+
+from analysis_cache import MemoCache
+
+
+def test_failed_compute_releases_its_key_lock():
+    cache = MemoCache()
+
+    def fail():
+        raise RuntimeError("fetch failed")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute('key', fail)
+    assert cache.key_locks == {}
+    assert cache.get_or_compute('key', lambda: 1) == 1
+
+
+def test_none_is_memoized_only_when_asked():
+    cache = MemoCache()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return None
+
+    for _ in range(3):
+        cache.get_or_compute('plain', fetch)
+    assert len(calls) == 3
+
+    calls.clear()
+    for _ in range(3):
+        assert cache.get_or_compute('failed', fetch, ttl=60, cache_none=True, count_as=('fetch', 'X')) is None
+    assert len(calls) == 1
+    assert cache.counts[('fetch', 'X')] == 1
+
+
+def test_concurrent_callers_compute_once():
+    cache = MemoCache()
+    started = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.wait(0.2)
+        return 'value'
+
+    threads = [threading.Thread(target=cache.get_or_compute, args=('key', slow)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    started.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
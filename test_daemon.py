@@ -0,0 +1,145 @@
+import os
+import pickle
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from daemon import IST, MarketCalendar, ScanDaemon
+
+# 2026-01-26 (Mon) is Republic Day
+calendar = MarketCalendar(['2026-01-26'])
+
+
+def ist(*args):
+    return datetime(*args, tzinfo=IST)
+
+
+def test_calendar_sessions():
+    assert calendar.covers(2026) and not calendar.covers(2027)
+    assert calendar.is_trading_day(date(2026, 1, 23))
+    assert not calendar.is_trading_day(date(2026, 1, 24))  # Saturday
+    assert not calendar.is_trading_day(date(2026, 1, 26))
+    assert calendar.is_open(ist(2026, 1, 23, 9, 15))
+    assert not calendar.is_open(ist(2026, 1, 23, 15, 30))
+    assert not calendar.is_open(ist(2026, 1, 26, 11, 0))
+
+
+def test_bar_closes_end_at_the_session_close():
+    closes = calendar.bar_closes(date(2026, 1, 23), 15)
+    assert len(closes) == 25
+    assert closes[0] == ist(2026, 1, 23, 9, 30)
+    assert closes[-1] == ist(2026, 1, 23, 15, 30)
+    # 375 minutes do not divide into 60-minute bars; the last one is short
+    assert calendar.bar_closes(date(2026, 1, 23), 60)[-2:] == [ist(2026, 1, 23, 15, 15), ist(2026, 1, 23, 15, 30)]
+
+
+def test_next_bar_close_skips_weekends_and_holidays():
+    assert calendar.next_bar_close(ist(2026, 1, 23, 9, 30), 15) == ist(2026, 1, 23, 9, 45)
+    assert calendar.next_bar_close(ist(2026, 1, 23, 8, 0), 15) == ist(2026, 1, 23, 9, 30)
+    # Friday after the close -> Tuesday, past the weekend and the Monday holiday
+    assert calendar.next_bar_close(ist(2026, 1, 23, 15, 30), 15) == ist(2026, 1, 27, 9, 30)
+
+
+@pytest.fixture
+def trader(tmp_path):
+    from benchmark import BenchmarkTrader, FakeUpstoxServer, make_instrument_index
+    from ratelimit import RateLimiter
+
+    with FakeUpstoxServer() as server:
+        trader = BenchmarkTrader('benchmark', 'benchmark', base_url=server.base_url, candle_store_dir=None,
+                                 fundamentals_cache_path=str(tmp_path / 'fundamentals.json'), journal_dir=None)
+        trader.instruments = make_instrument_index(['A', 'B'], str(tmp_path))
+        trader.rate_limiter = RateLimiter([])
+        trader.server = server
+        yield trader
+
+
+def make_daemon(trader, tmp_path):
+    return ScanDaemon(trader, ['A', 'B'], state_path=str(tmp_path / 'state.pkl'), lock_path=str(tmp_path / 'daemon.lock'),
+                      calendar=calendar)
+
+
+def test_new_session_reseeds_from_history(trader, tmp_path):
+    requests = trader.server.requests
+    daemon = make_daemon(trader, tmp_path)
+    daemon.warm_up()
+    assert requests['historical-candle'] == 2
+
+    daemon.run_cycle()
+    assert requests['historical-candle'] == 2
+
+    # A long-running daemon crossing into the next session, long after the candles were memoized
+    daemon.session_date -= timedelta(days=1)
+    trader.analysis_cache.clear()
+    results = daemon.run_cycle()
+    assert requests['historical-candle'] == 4
+    assert daemon.session_date == datetime.now(IST).date()
+    assert {r['ticker'] for r in results} == {'A', 'B'}
+
+
+def test_saved_state_is_restored_only_within_its_session(trader, tmp_path):
+    requests = trader.server.requests
+    daemon = make_daemon(trader, tmp_path)
+    daemon.warm_up()
+    daemon.save_state()
+
+    make_daemon(trader, tmp_path).warm_up()
+    assert requests['historical-candle'] == 2
+
+    with open(tmp_path / 'state.pkl', 'rb') as f:
+        saved = pickle.load(f)
+    saved['trading_date'] -= timedelta(days=1)
+    with open(tmp_path / 'state.pkl', 'wb') as f:
+        pickle.dump(saved, f)
+    trader.analysis_cache.clear()
+    make_daemon(trader, tmp_path).warm_up()
+    assert requests['historical-candle'] == 4
+
+
+def test_fundamentals_near_expiry_are_prefetched_before_the_cycle(trader, tmp_path, monkeypatch):
+    fetched = []
+    fetch = trader._fetch_fundamentals_info
+    monkeypatch.setattr(trader, '_fetch_fundamentals_info', lambda ticker: fetched.append(ticker) or fetch(ticker))
+    daemon = make_daemon(trader, tmp_path)
+    daemon.warm_up()
+    assert sorted(fetched) == ['A', 'B']
+
+    daemon.run_cycle()
+    assert len(fetched) == 2
+
+    # 'A' expires before the next cycle would run, so it is refreshed ahead of evaluation
+    cache = trader.fundamentals_cache
+    for field, ttl in cache.ttls.items():
+        cache.entries['A'][field][1] -= ttl - daemon.fundamentals_margin / 2
+    prefetch = trader.prefetch_fundamentals
+    prefetched = []
+    monkeypatch.setattr(trader, 'prefetch_fundamentals', lambda *args: prefetched.append(prefetch(*args)))
+    daemon.run_cycle()
+    assert prefetched == [1]
+    assert sorted(fetched) == ['A', 'A', 'B']
+    assert cache.is_fresh('A', daemon.fundamentals_margin)
+
+
+def test_overrunning_cycle_skips_the_closes_it_missed(tmp_path):
+    daemon = ScanDaemon(None, [], lock_path=str(tmp_path / 'daemon.lock'), calendar=calendar, close_delay=5)
+    due = ist(2026, 1, 23, 9, 30, 5)
+    assert daemon.missed_closes(due, ist(2026, 1, 23, 9, 40)) == 0
+    assert daemon.missed_closes(due, ist(2026, 1, 23, 9, 45, 4)) == 0
+    assert daemon.missed_closes(due, ist(2026, 1, 23, 10, 1)) == 2
+    # The last close of Friday is followed by Tuesday's first, so an overnight stall misses only that
+    assert daemon.missed_closes(ist(2026, 1, 23, 15, 15, 5), ist(2026, 1, 27, 9, 0)) == 1
+
+
+def test_lock_is_exclusive_and_keeps_the_holder_pid(tmp_path):
+    path = tmp_path / 'daemon.lock'
+    path.write_text('99999999')
+    first = ScanDaemon(None, [], lock_path=str(path), calendar=calendar)
+    second = ScanDaemon(None, [], lock_path=str(path), calendar=calendar)
+    assert first._acquire_lock()
+    assert path.read_text() == str(os.getpid())
+
+    assert not second._acquire_lock()
+    assert path.read_text() == str(os.getpid())
+    first.lock_file.close()
+    assert second._acquire_lock()
+    second.lock_file.close()
@@ -0,0 +1,55 @@
+import os
+
+import numpy as np
+
+from journal import COLUMNS, ScanJournal
+
+DAY = '2026-03-02'
+
+
+def decision(ticker, adx):
+    return {'ticker': ticker, 'decision': 'BUY', 'reason': 'Breakout', 'entry': 100.0, 'adx': adx}
+
+
+def write(journal, *decisions, hour=10):
+    journal.record(list(decisions), timestamp=f'{DAY} {hour:02d}:00+05:30')
+    journal.flush()
+
+
+def test_torn_append_is_cut_to_the_shortest_column(tmp_path):
+    journal = ScanJournal(str(tmp_path))
+    write(journal, decision('A', 20), decision('B', 21))
+    partition = tmp_path / DAY
+
+    # Simulate a crash mid-batch: a third row reached only some columns, one of them half-written
+    for name in ('ts', 'ticker', 'entry'):
+        with open(partition / f'{name}.bin', 'ab') as f:
+            f.write(b'\x01' * np.dtype(COLUMNS[name]).itemsize)
+    with open(partition / 'adx.bin', 'ab') as f:
+        f.write(b'\x01' * 2)
+    assert list(journal.query(['ticker'])['ticker']) == ['A', 'B']
+
+    write(journal, decision('C', 22), hour=11)
+    journal.close()
+    df = journal.query(['ticker', 'adx', 'entry'])
+    assert list(df['ticker']) == ['A', 'B', 'C']
+    assert list(df['adx']) == [20, 21, 22]
+    for name, dtype in COLUMNS.items():
+        assert os.path.getsize(partition / f'{name}.bin') == 3 * np.dtype(dtype).itemsize, name
+
+
+def test_missing_column_reads_as_blank_and_keeps_the_day(tmp_path):
+    journal = ScanJournal(str(tmp_path))
+    write(journal, decision('A', 20), decision('B', 21))
+    os.remove(tmp_path / DAY / 'adx.bin')
+
+    df = journal.query(['ticker', 'adx'])
+    assert list(df['ticker']) == ['A', 'B']
+    assert df['adx'].isna().all()
+
+    write(journal, decision('C', 22), hour=11)
+    journal.close()
+    df = journal.query(['ticker', 'adx'])
+    assert list(df['ticker']) == ['A', 'B', 'C']
+    assert df['adx'].isna().tolist() == [True, True, False]
+    assert len(journal.query(['ticker'], ticker='C')) == 1
@@ -0,0 +1,76 @@
+import threading
+import time
+
+from ratelimit import RateLimiter
+
+
+def acquisitions(limiter, threads=8, per_thread=6, latency=0.01):
+    """Acquire from several threads, each followed by a stubbed request latency"""
+    stamps = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(per_thread):
+            granted = limiter.acquire()
+            with lock:
+                stamps.append(granted)
+            time.sleep(latency)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return sorted(stamps)
+
+
+def max_in_window(stamps, per):
+    # Every window of length `per` starting at a grant time (the busiest windows start at one)
+    return max(sum(1 for t in stamps if start <= t < start + per) for start in stamps)
+
+
+def test_no_window_exceeds_its_quota():
+    stamps = acquisitions(RateLimiter([(10, 0.2), (25, 1.0)]))
+
+    assert len(stamps) == 48
+    assert max_in_window(stamps, 0.2) <= 10
+    assert max_in_window(stamps, 1.0) <= 25
+
+
+def test_first_window_is_not_doubled():
+    stamps = acquisitions(RateLimiter([(10, 0.5)]), threads=4, per_thread=10, latency=0.0)
+
+    # A token bucket that starts full and keeps refilling lets ~20 through here
+    assert sum(1 for t in stamps if t < stamps[0] + 0.5) == 10
+
+
+def test_no_limits_never_blocks():
+    started = time.perf_counter()
+    stamps = acquisitions(RateLimiter([]), latency=0.0)
+    assert len(stamps) == 48
+    assert time.perf_counter() - started < 0.5
+
+
+def test_scan_stays_inside_quota_against_fake_server(tmp_path):
+    from benchmark import BenchmarkTrader, FakeUpstoxServer, make_instrument_index
+
+    class RecordingLimiter(RateLimiter):
+        def __init__(self, limits):
+            super().__init__(limits)
+            self.stamps = []
+
+        def acquire(self):
+            granted = super().acquire()
+            self.stamps.append(granted)
+            return granted
+
+    symbols = [f"SYN{i:03d}" for i in range(30)]
+    with FakeUpstoxServer(latency=0.01) as server:
+        trader = BenchmarkTrader('benchmark', 'benchmark', base_url=server.base_url, candle_store_dir=None,
+                                 fundamentals_cache_path=None, journal_dir=None)
+        trader.instruments = make_instrument_index(symbols, str(tmp_path))
+        trader.rate_limiter = RecordingLimiter([(10, 0.5)])
+        trader.scan(symbols)
+
+    assert server.requests['historical-candle'] == len(trader.rate_limiter.stamps) == 30
+    assert max_in_window(sorted(trader.rate_limiter.stamps), 0.5) <= 10
@@ -0,0 +1,6 @@
+from benchmark import check_startup_budget
+
+
+def test_startup_within_budget():
+    result, violations = check_startup_budget()
+    assert violations == [], f"startup over budget: {violations} ({result})"
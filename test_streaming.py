@@ -0,0 +1,112 @@
+import json
+import math
+from datetime import datetime, timezone
+
+import pytest
+
+from indicators import synthetic_frames
+from streaming import IndicatorState, QuoteFeed, quote_date
+
+KEY = 'NSE_EQ|INE000000001'
+
+
+@pytest.fixture(scope='module')
+def trader():
+    from benchmark import FakeUpstoxServer
+    from sampletest import SwingTraderPro
+
+    with FakeUpstoxServer() as server:
+        yield SwingTraderPro('benchmark', 'benchmark', base_url=server.base_url, candle_store_dir=None,
+                             fundamentals_cache_path=None, journal_dir=None)
+
+
+def record_quotes(path, df, ticks=3):
+    """Write one quotes message per intraday snapshot of each bar in `df`, like QuoteFeed(record_path=...)"""
+    with open(path, 'w') as f:
+        for timestamp, bar in df.iterrows():
+            for tick in range(1, ticks + 1):
+                # Partial bars converge on the final bar at the last snapshot
+                close = bar['open'] + (bar['close'] - bar['open']) * tick / ticks
+                quote = {
+                    'instrument_token': KEY,
+                    'timestamp': timestamp.replace(hour=9 + 2 * tick).isoformat(),
+                    'last_price': close,
+                    'volume': bar['volume'] * tick / ticks,
+                    'ohlc': {'open': bar['open'],
+                             'high': bar['high'] if tick == ticks else max(close, bar['open']),
+                             'low': bar['low'] if tick == ticks else min(close, bar['open']), 'close': close},
+                }
+                f.write(json.dumps({f'NSE_EQ:{KEY}': quote}) + '\n')
+
+
+def assert_same_technicals(got, expected):
+    for name, value in expected.items():
+        if name in ('ema_crossover', 'price_above_ema'):
+            assert bool(got[name]) == bool(value), name
+        else:
+            assert math.isclose(got[name], value, rel_tol=1e-9, abs_tol=1e-9), name
+
+
+def test_replayed_quotes_match_get_technicals(trader, tmp_path):
+    df = synthetic_frames(1, 160)['SYM0']
+    seed, live = df.iloc[:120], df.iloc[120:]
+    path = tmp_path / 'quotes.jsonl'
+    record_quotes(path, live)
+
+    feed = QuoteFeed({KEY: IndicatorState.from_frame(seed, symbol='SYM0')})
+    feed.replay(str(path))
+
+    expected = trader.get_technicals('SYM0', df=df.copy())
+    assert_same_technicals(feed.states[KEY].technicals(), expected)
+
+
+def test_replay_does_not_record_again(tmp_path):
+    df = synthetic_frames(1, 60)['SYM0']
+    path = tmp_path / 'quotes.jsonl'
+    record_quotes(path, df.iloc[50:])
+    before = path.read_text()
+
+    feed = QuoteFeed({KEY: IndicatorState.from_frame(df.iloc[:50], symbol='SYM0')}, record_path=str(path))
+    feed.replay(str(path))
+    assert path.read_text() == before
+
+
+def test_running_sums_survive_many_bars(trader):
+    df = synthetic_frames(1, 2000)['SYM0']
+    state = IndicatorState.from_frame(df, symbol='SYM0')
+    assert_same_technicals(state.technicals(), trader.get_technicals('SYM0', df=df.copy()))
+
+
+def test_quote_date_is_the_ist_session_date():
+    # 2024-01-02 01:00 IST is still 2024-01-01 in UTC
+    epoch_ms = int(datetime(2024, 1, 1, 19, 30, tzinfo=timezone.utc).timestamp() * 1000)
+    assert str(quote_date({'last_trade_time': str(epoch_ms)})) == '2024-01-02'
+    assert str(quote_date({'timestamp': '2024-01-01T19:30:00+00:00'})) == '2024-01-02'
+
+
+def test_live_rescan_patches_without_refetching_history(tmp_path):
+    from benchmark import FakeUpstoxServer, make_instrument_index
+    from sampletest import SwingTraderPro
+
+    with FakeUpstoxServer() as server:
+        trader = SwingTraderPro('benchmark', 'benchmark', base_url=server.base_url, candle_store_dir=str(tmp_path / 'candles'),
+                                fundamentals_cache_path=None, journal_dir=None)
+        trader.instruments = make_instrument_index(['A', 'B'], str(tmp_path))
+        trader.candle_refresh_seconds = 0  # Every cached frame and stored series is past its TTL
+        store = trader.candle_store
+
+        trader.refresh_live_bars(['A', 'B'])
+        assert server.requests['historical-candle'] == 2
+        refreshed = {series: entry['updated'] for series, entry in store.index.items()}
+
+        # Same session: patch the cached frames, and the patch does not count as a history refresh
+        trader.refresh_live_bars(['A', 'B'])
+        assert server.requests['historical-candle'] == 2
+        assert server.requests['market-quote'] == 2
+        assert {series: entry['updated'] for series, entry in store.index.items()} == refreshed
+
+        # A quote from a newer session than the cached frame refetches that symbol's history
+        key = ('candles', 'A', 'day', 100)
+        trader.analysis_cache.put(key, trader.analysis_cache.peek(key).iloc[:-1])
+        trader.refresh_live_bars(['A', 'B'])
+        assert server.requests['historical-candle'] == 3
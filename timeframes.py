@@ -0,0 +1,216 @@
+import time
+import numpy as np
+import pandas as pd
+
+from candle_decoder import CANDLE_COLUMNS, columns_to_frame
+from streaming import IndicatorState
+
+# NSE cash session 09:15-15:30 IST; intraday bars are anchored at the open
+SESSION_OPEN = 9 * 60 + 15
+SESSION_CLOSE = 15 * 60 + 30
+IST_OFFSET = 19800 * 1_000_000_000
+MINUTE = 60 * 1_000_000_000
+DAY = 24 * 60 * MINUTE
+
+TIMEFRAME_MINUTES = {'1minute': 1, '5minute': 5, '15minute': 15, '30minute': 30, '60minute': 60, 'day': None}
+
+
+def bar_starts(timestamps, timeframe):
+    """
+    Start of the `timeframe` bar each 1-minute timestamp (int64 ns UTC)
+    belongs to, plus a mask of the minutes inside the NSE session. Daily bars
+    start at IST midnight like the broker's daily candles; the last intraday
+    bar of a session may be shorter (e.g. 15:15-15:30 for 60minute).
+    """
+    minutes = TIMEFRAME_MINUTES[timeframe]
+    local = np.asarray(timestamps, dtype=np.int64) + IST_OFFSET
+    day = local // DAY * DAY
+    minute_of_day = (local - day) // MINUTE
+    in_session = (minute_of_day >= SESSION_OPEN) & (minute_of_day < SESSION_CLOSE)
+    if minutes is None:
+        return day - IST_OFFSET, in_session
+    bucket = (minute_of_day - SESSION_OPEN) // minutes
+    return day + (SESSION_OPEN + bucket * minutes) * MINUTE - IST_OFFSET, in_session
+
+
+def resample_columns(columns, timeframe):
+    """Aggregate decoded 1-minute columns (candle_decoder layout, ascending) into `timeframe` bars"""
+    starts, in_session = bar_starts(columns['timestamp'], timeframe)
+    if not in_session.all():
+        columns = {col: values[in_session] for col, values in columns.items()}
+        starts = starts[in_session]
+    if len(starts) == 0:
+        return {col: values[:0] for col, values in columns.items()}
+
+    first = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    last = np.r_[first[1:] - 1, len(starts) - 1]
+    return {
+        'timestamp': starts[first],
+        'open': columns['open'][first],
+        'high': np.maximum.reduceat(columns['high'], first),
+        'low': np.minimum.reduceat(columns['low'], first),
+        'close': columns['close'][last],
+        'volume': np.add.reduceat(columns['volume'], first),
+        'oi': columns['oi'][last],
+    }
+
+
+def frame_columns(df):
+    """candle_decoder-style columns from a get_ohlc_data DataFrame"""
+    columns = {col: df[col].to_numpy() for col in CANDLE_COLUMNS}
+    columns['timestamp'] = df.index.as_unit('ns').asi8
+    return columns
+
+
+def resample(df, timeframe):
+    """Resample a 1-minute get_ohlc_data frame into `timeframe` bars"""
+    if timeframe == '1minute':
+        return df
+    return columns_to_frame(resample_columns(frame_columns(df), timeframe))
+
+
+class MultiTimeframeState:
+    """
+    Streaming IndicatorState per timeframe driven by 1-minute bars.
+
+    A new (or revised) 1-minute bar only touches the forming bar of each
+    timeframe: the minutes already completed in that bar are kept as one
+    partial aggregate, so each update is O(1) per timeframe regardless of
+    history length.
+    """
+
+    def __init__(self, symbol, df, timeframes=('15minute', '60minute', 'day')):
+        self.symbol = symbol
+        self.timeframes = list(timeframes)
+        self.states = {}
+        self.partial = {}
+        self.minute = None
+
+        # Seed from every minute but the last, which is then replayed as live data
+        history, latest = df.iloc[:-1], df.iloc[-1:]
+        for timeframe in self.timeframes:
+            bars = resample(history, timeframe)
+            self.states[timeframe] = IndicatorState.from_frame(bars, symbol=symbol, bar_key=lambda ts: ts.value)
+            if len(bars):
+                row = bars.iloc[-1]
+                self.partial[timeframe] = (bars.index[-1].value, row['open'], row['high'], row['low'],
+                                           row['close'], row['volume'])
+            else:
+                self.partial[timeframe] = None
+        for timestamp, row in latest.iterrows():
+            self.on_bar(timestamp, row['open'], row['high'], row['low'], row['close'], row['volume'])
+
+    def on_bar(self, timestamp, open_, high, low, close, volume):
+        """
+        Apply a 1-minute bar. Repeating the same timestamp revises the forming
+        minute; a new timestamp completes the previous one. Minutes outside
+        the session are ignored.
+        """
+        ts = pd.Timestamp(timestamp).value
+        if self.minute is not None and ts != self.minute[0]:
+            self._fold(self.minute)
+        self.minute = (ts, open_, high, low, close, volume)
+
+        for timeframe in self.timeframes:
+            key = _bar_start(ts, timeframe)
+            if key is None:
+                continue
+            state, partial = self.states[timeframe], self.partial[timeframe]
+            if partial is not None and partial[0] != key:
+                state.close_bar()
+                partial = self.partial[timeframe] = None
+            bar = _merge(partial, (key, open_, high, low, close, volume))
+            state.update(*bar[1:], bar_key=key)
+        return self.technicals()
+
+    def _fold(self, minute):
+        """Add a completed minute to each timeframe's partial bar"""
+        for timeframe in self.timeframes:
+            key = _bar_start(minute[0], timeframe)
+            if key is None:
+                continue
+            partial = self.partial[timeframe]
+            if partial is not None and partial[0] != key:
+                partial = None
+            self.partial[timeframe] = _merge(partial, (key,) + minute[1:])
+
+    def technicals(self):
+        """{timeframe: get_technicals summary} for the forming bar of each timeframe"""
+        return {timeframe: state.technicals() for timeframe, state in self.states.items()}
+
+
+def _bar_start(ts, timeframe):
+    """Scalar bar_starts for one timestamp; None outside the session"""
+    local = ts + IST_OFFSET
+    day = local // DAY * DAY
+    minute_of_day = (local - day) // MINUTE
+    if not SESSION_OPEN <= minute_of_day < SESSION_CLOSE:
+        return None
+    minutes = TIMEFRAME_MINUTES[timeframe]
+    if minutes is None:
+        return day - IST_OFFSET
+    return day + (SESSION_OPEN + (minute_of_day - SESSION_OPEN) // minutes * minutes) * MINUTE - IST_OFFSET
+
+
+def _merge(partial, minute):
+    if partial is None:
+        return minute
+    key, open_, high, low, _, volume = partial
+    return (key, open_, max(high, minute[2]), min(low, minute[3]), minute[4], volume + minute[5])
+
+
+def timeframes_aligned(technicals):
+    """True when every timeframe shows +DI > -DI and a bullish 9/21/50 EMA stack"""
+    return all(
+        t is not None and t['plus_di'] > t['minus_di'] and t['ema_crossover']
+        for t in technicals.values()
+    )
+
+
+def synthetic_minutes(n_days=20, seed=0):
+    """Random-walk 1-minute session candles for benchmarks"""
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range(end='2024-01-05', periods=n_days, tz='Asia/Kolkata')
+    offsets = pd.to_timedelta(SESSION_OPEN + np.arange(SESSION_CLOSE - SESSION_OPEN), unit='min')
+    index = pd.DatetimeIndex([day + offset for day in days for offset in offsets], name='timestamp')
+    n = len(index)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    spread = close * rng.uniform(0.0002, 0.002, n)
+    return pd.DataFrame({
+        'open': close + rng.normal(0, 0.5, n) * spread,
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': rng.integers(100, 10_000, n).astype(np.float64),
+        'oi': 0.0,
+    }, index=index)
+
+
+def benchmark(n_days=60, timeframes=('5minute', '15minute', '60minute', 'day')):
+    """Vectorized resampling against pandas .resample, and per-minute streaming cost"""
+    df = synthetic_minutes(n_days)
+    for timeframe in timeframes:
+        start = time.perf_counter()
+        fast = resample(df, timeframe)
+        elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        rule = 'D' if timeframe == 'day' else f"{TIMEFRAME_MINUTES[timeframe]}min"
+        slow = df.resample(rule, origin=pd.Timestamp('2000-01-01 09:15', tz='Asia/Kolkata') if timeframe != 'day'
+                           else 'start_day').agg({'open': 'first', 'high': 'max', 'low': 'min',
+                                                  'close': 'last', 'volume': 'sum'}).dropna()
+        reference = time.perf_counter() - start
+        assert np.allclose(fast[['open', 'high', 'low', 'close', 'volume']].to_numpy(), slow.to_numpy())
+        print(f"{timeframe}: {len(df)} -> {len(fast)} bars, {elapsed * 1000:.1f} ms "
+              f"(pandas resample {reference * 1000:.1f} ms)")
+
+    state = MultiTimeframeState('BENCH', df.iloc[:-375], timeframes)
+    start = time.perf_counter()
+    for timestamp, row in df.iloc[-375:].iterrows():
+        state.on_bar(timestamp, row['open'], row['high'], row['low'], row['close'], row['volume'])
+    per_bar = (time.perf_counter() - start) / 375
+    print(f"Streaming: {per_bar * 1e6:.0f} us per 1-minute bar across {len(timeframes)} timeframes")
+
+
+if __name__ == "__main__":
+    benchmark()
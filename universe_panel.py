@@ -0,0 +1,257 @@
+import time
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from config import panel_dtype, panel_lookback, panel_bytes_per_symbol
+from indicators import EMA_SPANS, ADX_PERIOD, VOLUME_PERIOD, latest_technicals
+
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+OUTPUTS = tuple(f'{span}_ema' for span in EMA_SPANS) + (
+    'atr', 'plus_di', 'minus_di', 'adx', f'{VOLUME_PERIOD}_day_vol', 'rvol'
+)
+SCRATCH = ('tr', 'plus_dm', 'minus_dm', 'dx', 'prev')
+SLACK = 0.25  # Extra bar slots so old bars are shifted out once per lookback/4 appends
+MARKET_TZ = 'Asia/Kolkata'
+
+
+def slots_for(lookback):
+    return lookback + max(1, int(lookback * SLACK))
+
+
+def bytes_per_symbol(lookback, dtype=panel_dtype):
+    """Memory one symbol costs in a panel: price fields, indicator outputs, scratch buffers and masks"""
+    per_slot = (len(FIELDS) + len(OUTPUTS) + len(SCRATCH)) * np.dtype(dtype).itemsize + 2
+    return slots_for(lookback) * per_slot
+
+
+def max_lookback(budget=panel_bytes_per_symbol, dtype=panel_dtype):
+    """Longest lookback that fits `budget` bytes per symbol"""
+    per_slot = (len(FIELDS) + len(OUTPUTS) + len(SCRATCH)) * np.dtype(dtype).itemsize + 2
+    return int(budget / per_slot / (1 + SLACK))
+
+
+def _rolling_mean_into(values, window, out):
+    """Trailing mean written into `out` (NaN until `window` bars), without temporaries"""
+    out[..., :window - 1] = np.nan
+    if values.shape[-1] >= window:
+        np.sum(sliding_window_view(values, window, axis=-1), axis=-1, out=out[..., window - 1:])
+        out[..., window - 1:] /= window
+
+
+def _ema_into(values, span, out):
+    """pandas ewm(span, adjust=True) along bars, accumulated in float64 per symbol"""
+    decay = 1.0 - 2.0 / (span + 1.0)
+    num = np.zeros(values.shape[0])
+    den = np.zeros(values.shape[0])
+    for i in range(values.shape[-1]):
+        col = values[:, i]
+        valid = ~np.isnan(col)
+        num *= decay
+        den *= decay
+        num[valid] += col[valid]
+        den[valid] += 1.0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out[:, i] = num / den
+
+
+class UniversePanel:
+    """
+    Contiguous (field, symbol, bar) arrays for a whole universe on one shared
+    bar clock, bounded to `lookback` bars.
+
+    New bars are written in place at the end of a slightly larger buffer and
+    the window is shifted back only when the slack is used up, so the live
+    window is always a contiguous, chronological view. Indicators are
+    computed into preallocated output and scratch buffers that are reused on
+    every compute(); DataFrames are only built on request by frame().
+    """
+
+    def __init__(self, symbols, lookback=panel_lookback, dtype=panel_dtype, budget=panel_bytes_per_symbol):
+        self.symbols = list(symbols)
+        self.rows = {symbol: row for row, symbol in enumerate(self.symbols)}
+        self.lookback = lookback
+        self.dtype = np.dtype(dtype)
+        if budget and bytes_per_symbol(lookback, self.dtype) > budget:
+            raise ValueError(
+                f"lookback {lookback} needs {bytes_per_symbol(lookback, self.dtype)} bytes/symbol "
+                f"(budget {budget}); use at most {max_lookback(budget, self.dtype)} bars"
+            )
+
+        n, slots = len(self.symbols), slots_for(lookback)
+        self.data = np.full((len(FIELDS), n, slots), np.nan, dtype=self.dtype)
+        self.timestamps = np.zeros(slots, dtype=np.int64)
+        self.start = self.end = 0
+        self.outputs = {name: np.empty((n, slots), dtype=self.dtype) for name in OUTPUTS}
+        self.scratch = {name: np.empty((n, slots), dtype=self.dtype) for name in SCRATCH}
+        self.masks = np.empty((2, n, slots), dtype=bool)
+        self.computed = False
+
+    def __len__(self):
+        return self.end - self.start
+
+    def nbytes(self):
+        arrays = [self.data, self.timestamps, self.masks, *self.outputs.values(), *self.scratch.values()]
+        return sum(a.nbytes for a in arrays)
+
+    def field(self, name):
+        """Chronological (symbols, bars) view of one price field"""
+        return self.data[FIELDS.index(name), :, self.start:self.end]
+
+    # ------------------------------------------------------------------ write
+
+    def load(self, frames):
+        """
+        Fill the panel from {symbol: OHLCV DataFrame}, aligning every symbol
+        on the union of their last `lookback` timestamps (missing bars NaN).
+        """
+        stamps = [df.index.as_unit('ns').asi8[-self.lookback:] for df in frames.values() if df is not None and len(df)]
+        axis = np.unique(np.concatenate(stamps))[-self.lookback:] if stamps else np.empty(0, dtype=np.int64)
+        self.data.fill(np.nan)
+        self.start, self.end = 0, len(axis)
+        self.timestamps[:len(axis)] = axis
+        for symbol, df in frames.items():
+            row = self.rows.get(symbol)
+            if row is None or df is None or not len(df):
+                continue
+            ts = df.index.as_unit('ns').asi8
+            keep = np.isin(ts, axis)
+            cols = np.searchsorted(axis, ts[keep])
+            for i, name in enumerate(FIELDS):
+                self.data[i, row, cols] = df[name].to_numpy()[keep]
+        self.computed = False
+
+    def _advance(self, timestamp):
+        """Open a new bar slot at the end, shifting the window back when the slack is used up"""
+        if self.end == self.data.shape[-1]:
+            keep = self.lookback - 1
+            self.data[:, :, :keep] = self.data[:, :, self.end - keep:self.end]
+            self.timestamps[:keep] = self.timestamps[self.end - keep:self.end]
+            self.start, self.end = 0, keep
+        self.data[:, :, self.end] = np.nan
+        self.timestamps[self.end] = timestamp
+        self.end += 1
+        if self.end - self.start > self.lookback:
+            self.start += 1
+
+    def update(self, symbol, timestamp, open_, high, low, close, volume):
+        """
+        Write one symbol's bar. The newest bar is overwritten in place (live
+        partial bar); a later timestamp opens a new bar for the whole universe.
+        Bars older than the newest are ignored.
+        """
+        ts = pd.Timestamp(timestamp).value
+        if len(self) == 0 or ts > self.timestamps[self.end - 1]:
+            self._advance(ts)
+        elif ts != self.timestamps[self.end - 1]:
+            return False
+        self.data[:, self.rows[symbol], self.end - 1] = (open_, high, low, close, volume)
+        self.computed = False
+        return True
+
+    # ------------------------------------------------------------------ compute
+
+    def compute(self):
+        """Recompute every indicator into the reusable buffers; returns {name: (symbols, bars) view}"""
+        n = len(self)
+        high, low, close, volume = (self.field(name) for name in ('high', 'low', 'close', 'volume'))
+        out = {name: buf[:, :n] for name, buf in self.outputs.items()}
+        tr, plus_dm, minus_dm, dx, prev = (self.scratch[name][:, :n] for name in SCRATCH)
+        plus_mask, minus_mask = self.masks[0, :, :n], self.masks[1, :, :n]
+        if n == 0:
+            return out
+
+        for span in EMA_SPANS:
+            _ema_into(close, span, out[f'{span}_ema'])
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # True range: max(high - low, |high - prev close|, |low - prev close|)
+            np.subtract(high, low, out=tr)
+            prev[:, 0] = np.nan
+            np.subtract(high[:, 1:], close[:, :-1], out=prev[:, 1:])
+            np.abs(prev, out=prev)
+            np.fmax(tr, prev, out=tr)
+            np.subtract(low[:, 1:], close[:, :-1], out=prev[:, 1:])
+            np.abs(prev, out=prev)
+            np.fmax(tr, prev, out=tr)
+
+            # Directional movement with the get_technicals tie-breaking
+            plus_dm[:, 0] = np.nan
+            np.subtract(high[:, 1:], high[:, :-1], out=plus_dm[:, 1:])
+            minus_dm[:, 0] = np.nan
+            np.subtract(low[:, :-1], low[:, 1:], out=minus_dm[:, 1:])
+            np.greater(plus_dm, minus_dm, out=plus_mask)
+            np.greater(plus_dm, 0, out=minus_mask)
+            plus_mask &= minus_mask
+            np.copyto(plus_dm, 0, where=~plus_mask)
+            np.greater(minus_dm, plus_dm, out=minus_mask)
+            np.greater(minus_dm, 0, out=plus_mask)
+            minus_mask &= plus_mask
+            np.copyto(minus_dm, 0, where=~minus_mask)
+
+            atr, plus_di, minus_di = out['atr'], out['plus_di'], out['minus_di']
+            _rolling_mean_into(tr, ADX_PERIOD, atr)
+            _rolling_mean_into(plus_dm, ADX_PERIOD, plus_di)
+            np.divide(plus_di, atr, out=plus_di)
+            plus_di *= 100
+            _rolling_mean_into(minus_dm, ADX_PERIOD, minus_di)
+            np.divide(minus_di, atr, out=minus_di)
+            minus_di *= 100
+
+            np.subtract(plus_di, minus_di, out=dx)
+            np.abs(dx, out=dx)
+            np.add(plus_di, minus_di, out=prev)
+            np.divide(dx, prev, out=dx)
+            dx *= 100
+            _rolling_mean_into(dx, ADX_PERIOD, out['adx'])
+
+            vol_avg = out[f'{VOLUME_PERIOD}_day_vol']
+            _rolling_mean_into(volume, VOLUME_PERIOD, vol_avg)
+            np.divide(volume, vol_avg, out=out['rvol'])
+
+        self.computed = True
+        return out
+
+    def indicators(self):
+        return self.compute() if not self.computed else {name: buf[:, :len(self)] for name, buf in self.outputs.items()}
+
+    def latest(self):
+        """{symbol: get_technicals summary} for the newest bar"""
+        return latest_technicals(self.symbols, self.indicators(), self.field('close'))
+
+    def frame(self, symbol):
+        """DataFrame of one symbol's bars and indicators, built on demand for plotting or debugging"""
+        row = self.rows[symbol]
+        indicators = self.indicators()
+        index = pd.DatetimeIndex(pd.to_datetime(self.timestamps[self.start:self.end], unit='ns', utc=True),
+                                 name='timestamp').tz_convert(MARKET_TZ)
+        columns = {name: self.field(name)[row] for name in FIELDS}
+        columns.update({name: values[row] for name, values in indicators.items()})
+        return pd.DataFrame(columns, index=index).dropna(subset=['close'])
+
+
+def benchmark(n_symbols=2000, n_bars=250):
+    """Panel memory and compute time against per-symbol technicals_frame DataFrames"""
+    from indicators import synthetic_frames, technicals_frame
+
+    frames = synthetic_frames(n_symbols, n_bars)
+    start = time.perf_counter()
+    legacy = {symbol: technicals_frame(df.copy()) for symbol, df in frames.items()}
+    legacy_seconds = time.perf_counter() - start
+    legacy_bytes = sum(df.memory_usage(deep=True).sum() for df in legacy.values())
+
+    for dtype in ('float64', 'float32'):
+        panel = UniversePanel(list(frames), lookback=n_bars, dtype=dtype, budget=None)
+        panel.load(frames)
+        start = time.perf_counter()
+        panel.compute()
+        seconds = time.perf_counter() - start
+        sample = legacy['SYM0'].iloc[-1]
+        got = panel.frame('SYM0').iloc[-1]
+        assert all(np.isclose(got[k], sample[k], rtol=1e-3, equal_nan=True) for k in OUTPUTS)
+        print(f"{dtype}: {panel.nbytes() / n_symbols / 1024:.1f} KiB/symbol, compute {seconds * 1000:.0f} ms")
+    print(f"DataFrames: {legacy_bytes / n_symbols / 1024:.1f} KiB/symbol, technicals_frame {legacy_seconds * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    benchmark()